@@ -0,0 +1,68 @@
+"""add order filter indexes
+
+Revision ID: 863c133fbdee
+Revises: 9c6f39dd46b4
+Create Date: 2026-10-18 10:12:40.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "863c133fbdee"
+down_revision: Union[str, None] = "9c6f39dd46b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_ORDERS = sa.text("NOT is_deleted")
+
+ORDER_INDEXES = {
+    "ix_orders_active_user_id_id": ["user_id", "id"],
+    "ix_orders_active_user_id_status_total_price": [
+        "user_id",
+        "status",
+        "total_price",
+        "id",
+    ],
+    "ix_orders_active_status_total_price": ["status", "total_price", "id"],
+    "ix_orders_active_total_price": ["total_price", "id"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции,
+    # зато он не блокирует запись в таблицы на время построения индекса.
+    with op.get_context().autocommit_block():
+        for name, columns in ORDER_INDEXES.items():
+            op.create_index(
+                name,
+                "orders",
+                columns,
+                unique=False,
+                postgresql_where=ACTIVE_ORDERS,
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            op.f("ix_products_order_id"),
+            "products",
+            ["order_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_products_order_id"),
+            table_name="products",
+            postgresql_concurrently=True,
+        )
+        for name in reversed(list(ORDER_INDEXES)):
+            op.drop_index(name, table_name="orders", postgresql_concurrently=True)
@@ -0,0 +1,61 @@
+"""create order stats table
+
+Revision ID: 07db7b8c22b4
+Revises: 863c133fbdee
+Create Date: 2026-10-18 16:40:12.504117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "07db7b8c22b4"
+down_revision: Union[str, None] = "863c133fbdee"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "order_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        # Тип orderstatus уже создан вместе с таблицей orders.
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "CONFIRMED",
+                "CANCELLED",
+                name="orderstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "status", name="uq_order_stats_user_id_status"),
+    )
+    op.create_index(op.f("ix_order_stats_id"), "order_stats", ["id"], unique=False)
+    # Начальное заполнение сводки по существующим заказам.
+    op.execute(
+        "INSERT INTO order_stats (user_id, status, count, revenue) "
+        "SELECT user_id, status, count(*), sum(total_price) FROM orders "
+        "WHERE NOT is_deleted GROUP BY user_id, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_order_stats_id"), table_name="order_stats")
+    op.drop_table("order_stats")
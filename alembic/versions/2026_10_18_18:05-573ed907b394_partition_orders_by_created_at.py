@@ -0,0 +1,136 @@
+"""partition orders by created_at
+
+Revision ID: 573ed907b394
+Revises: 07db7b8c22b4
+Create Date: 2026-10-18 18:05:27.913460
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "573ed907b394"
+down_revision: Union[str, None] = "07db7b8c22b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Секции создаются на текущий месяц и столько месяцев вперёд; дальше — python -m app.cli create-partitions.
+MONTHS_AHEAD = 3
+
+ORDER_COLUMNS = "id, status, total_price, is_deleted, customer_name, user_id"
+
+ORDER_INDEXES = {
+    "ix_orders_active_user_id_id": "user_id, id",
+    "ix_orders_active_user_id_status_total_price": "user_id, status, total_price, id",
+    "ix_orders_active_status_total_price": "status, total_price, id",
+    "ix_orders_active_total_price": "total_price, id",
+}
+
+PARTITIONED_ORDER_INDEXES = {
+    **ORDER_INDEXES,
+    "ix_orders_active_user_id_created_at": "user_id, created_at",
+}
+
+
+def create_order_indexes(indexes: dict) -> None:
+    op.execute("CREATE INDEX ix_orders_id ON orders (id)")
+    for name, columns in indexes.items():
+        op.execute(f"CREATE INDEX {name} ON orders ({columns}) WHERE NOT is_deleted")
+
+
+def drop_order_indexes(indexes: dict) -> None:
+    op.execute("DROP INDEX ix_orders_id")
+    for name in indexes:
+        op.execute(f"DROP INDEX {name}")
+
+
+def month_bounds(offset: int):
+    now = datetime.now(timezone.utc)
+    index = now.year * 12 + now.month - 1 + offset
+    return (
+        f"{index // 12:04d}-{index % 12 + 1:02d}-01",
+        f"{(index + 1) // 12:04d}-{(index + 1) % 12 + 1:02d}-01",
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Таблица пересоздаётся и заполняется заново под блокировкой: миграцию нужно
+    # выполнять в окно обслуживания. Время создания существующих заказов неизвестно,
+    # им проставляется момент миграции.
+    #
+    # Первичный и уникальные ключи секционированной таблицы должны включать created_at,
+    # поэтому ключ становится (id, created_at), а внешний ключ products.order_id снимается
+    # (составной ключ (order_id, order_created_at) добавляет миграция 9f9187e6a839).
+    op.execute("ALTER TABLE products DROP CONSTRAINT products_order_id_fkey")
+    op.execute("ALTER TABLE orders RENAME TO orders_unpartitioned")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_unpartitioned_pkey")
+    drop_order_indexes(ORDER_INDEXES)
+
+    op.execute("""
+        CREATE TABLE orders (
+            id integer NOT NULL DEFAULT nextval('orders_id_seq'),
+            status orderstatus NOT NULL,
+            total_price integer NOT NULL,
+            is_deleted boolean NOT NULL,
+            customer_name varchar NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id),
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT orders_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """)
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    # Заказы, для месяца которых секция ещё не создана, попадают в секцию по умолчанию.
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+    for offset in range(MONTHS_AHEAD + 1):
+        start, end = month_bounds(offset)
+        op.execute(
+            f"CREATE TABLE orders_{start[:4]}_{start[5:7]} PARTITION OF orders "
+            f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+        )
+
+    op.execute(
+        f"INSERT INTO orders ({ORDER_COLUMNS}) "
+        f"SELECT {ORDER_COLUMNS} FROM orders_unpartitioned"
+    )
+    op.execute("DROP TABLE orders_unpartitioned")
+
+    # Индексы на секционированной таблице создаются во всех секциях, в том числе будущих.
+    create_order_indexes(PARTITIONED_ORDER_INDEXES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Заказы из отключённых (DETACH) секций в обычную таблицу не возвращаются.
+    op.execute("ALTER TABLE orders RENAME TO orders_partitioned")
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_partitioned_pkey")
+    drop_order_indexes(PARTITIONED_ORDER_INDEXES)
+
+    op.execute("""
+        CREATE TABLE orders (
+            id integer NOT NULL DEFAULT nextval('orders_id_seq'),
+            status orderstatus NOT NULL,
+            total_price integer NOT NULL,
+            is_deleted boolean NOT NULL,
+            customer_name varchar NOT NULL,
+            user_id integer NOT NULL REFERENCES users (id),
+            CONSTRAINT orders_pkey PRIMARY KEY (id)
+        )
+        """)
+    op.execute("ALTER SEQUENCE orders_id_seq OWNED BY orders.id")
+    op.execute(
+        f"INSERT INTO orders ({ORDER_COLUMNS}) "
+        f"SELECT {ORDER_COLUMNS} FROM orders_partitioned"
+    )
+    op.execute("DROP TABLE orders_partitioned")
+
+    create_order_indexes(ORDER_INDEXES)
+    op.execute(
+        "ALTER TABLE products ADD CONSTRAINT products_order_id_fkey "
+        "FOREIGN KEY (order_id) REFERENCES orders (id)"
+    )
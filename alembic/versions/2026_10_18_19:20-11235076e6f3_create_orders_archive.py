@@ -0,0 +1,102 @@
+"""create orders archive
+
+Revision ID: 11235076e6f3
+Revises: 573ed907b394
+Create Date: 2026-10-18 19:20:44.170382
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "11235076e6f3"
+down_revision: Union[str, None] = "573ed907b394"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "orders", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    # Время удаления уже удалённых заказов неизвестно: срок до архивации отсчитывается от миграции.
+    op.execute("UPDATE orders SET deleted_at = now() WHERE is_deleted")
+    op.create_index(
+        "ix_orders_deleted_deleted_at",
+        "orders",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("is_deleted"),
+    )
+
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        # Тип orderstatus уже создан вместе с таблицей orders.
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "CONFIRMED",
+                "CANCELLED",
+                name="orderstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("total_price", sa.Integer(), nullable=False),
+        sa.Column("customer_name", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_orders_archive_id"), "orders_archive", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_orders_archive_user_id"), "orders_archive", ["user_id"], unique=False
+    )
+    op.create_table(
+        "products_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("price", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_products_archive_id"), "products_archive", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_products_archive_order_id"),
+        "products_archive",
+        ["order_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_products_archive_order_id"), table_name="products_archive")
+    op.drop_index(op.f("ix_products_archive_id"), table_name="products_archive")
+    op.drop_table("products_archive")
+    op.drop_index(op.f("ix_orders_archive_user_id"), table_name="orders_archive")
+    op.drop_index(op.f("ix_orders_archive_id"), table_name="orders_archive")
+    op.drop_table("orders_archive")
+    op.drop_index("ix_orders_deleted_deleted_at", table_name="orders")
+    op.drop_column("orders", "deleted_at")
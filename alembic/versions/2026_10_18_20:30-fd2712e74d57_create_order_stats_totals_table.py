@@ -0,0 +1,64 @@
+"""create order stats totals table
+
+Revision ID: fd2712e74d57
+Revises: 11235076e6f3
+Create Date: 2026-10-18 20:30:41.318205
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "fd2712e74d57"
+down_revision: Union[str, None] = "11235076e6f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Должно совпадать с app.domain.models.order_stats.STATS_TOTAL_SHARDS на момент миграции.
+STATS_TOTAL_SHARDS = 16
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "order_stats_totals",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        # Тип orderstatus уже создан вместе с таблицей orders.
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "CONFIRMED",
+                "CANCELLED",
+                name="orderstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "shard", "status", name="uq_order_stats_totals_shard_status"
+        ),
+    )
+    op.create_index(
+        op.f("ix_order_stats_totals_id"), "order_stats_totals", ["id"], unique=False
+    )
+    # Начальное заполнение итогов по сводке order_stats.
+    op.execute(
+        "INSERT INTO order_stats_totals (shard, status, count, revenue) "
+        f"SELECT user_id % {STATS_TOTAL_SHARDS}, status, sum(count), sum(revenue) "
+        f"FROM order_stats GROUP BY user_id % {STATS_TOTAL_SHARDS}, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_order_stats_totals_id"), table_name="order_stats_totals")
+    op.drop_table("order_stats_totals")
@@ -0,0 +1,63 @@
+"""add products order_created_at fkey
+
+Revision ID: 9f9187e6a839
+Revises: fd2712e74d57
+Create Date: 2026-10-18 21:10:06.552931
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9f9187e6a839"
+down_revision: Union[str, None] = "fd2712e74d57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRODUCT_COLUMNS = "id, name, price, quantity, order_id"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # После секционирования orders внешний ключ products.order_id был снят: первичный
+    # ключ orders — (id, created_at). Продукты получают копию created_at заказа, и ключ
+    # восстанавливается составным. Миграция обновляет все строки products: её нужно
+    # выполнять в окно обслуживания.
+    op.add_column(
+        "products",
+        sa.Column("order_created_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        "UPDATE products SET order_created_at = orders.created_at "
+        "FROM orders WHERE orders.id = products.order_id"
+    )
+    # Продукты, чьих заказов уже нет, не удаляются, а переносятся в архив.
+    op.execute(
+        f"INSERT INTO products_archive ({PRODUCT_COLUMNS}) "
+        f"SELECT {PRODUCT_COLUMNS} FROM products WHERE order_created_at IS NULL"
+    )
+    op.execute("DELETE FROM products WHERE order_created_at IS NULL")
+    op.alter_column("products", "order_created_at", nullable=False)
+    op.create_foreign_key(
+        "products_order_id_order_created_at_fkey",
+        "products",
+        "orders",
+        ["order_id", "order_created_at"],
+        ["id", "created_at"],
+        # Откладываемый ключ: create-partitions переносит заказы из секции по умолчанию
+        # в новую секцию и проверяет ключ только при commit.
+        deferrable=True,
+        initially="IMMEDIATE",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Продукты, перенесённые в архив при обновлении, в products не возвращаются.
+    op.drop_constraint(
+        "products_order_id_order_created_at_fkey", "products", type_="foreignkey"
+    )
+    op.drop_column("products", "order_created_at")
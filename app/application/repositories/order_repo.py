@@ -1,9 +1,91 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional, List, AsyncIterator, Dict, Tuple
+
+from sqlalchemy import tuple_, Select, insert, update, delete, func, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.application.repositories.base_repo import BaseRepository
-from app.domain.models import Order
+from app.domain.models import (
+    Order,
+    Product,
+    OrderStats,
+    OrderStatsTotal,
+    OrderArchive,
+    ProductArchive,
+)
+from app.domain.models.order import OrderStatus
+from app.domain.models.order_stats import STATS_TOTAL_SHARDS
+
+# Колонки ключа keyset-пагинации для каждого поддерживаемого поля сортировки.
+ORDER_SORT_KEYS = {
+    "id": (Order.id,),
+    "total_price": (Order.total_price, Order.id),
+}
+
+STREAM_BATCH_SIZE = 500
+
+# Изменения сводки: (user_id, статус) -> (изменение числа заказов, изменение выручки).
+StatsDelta = Dict[Tuple[int, OrderStatus], Tuple[int, int]]
+
+
+def build_orders_query(
+    filters: list,
+    limit: Optional[int] = None,
+    order_by: str = "id",
+    after: Optional[List[int]] = None,
+) -> Select:
+    """Строит запрос страницы заказов: фильтры, keyset-условие после ключа after, сортировка и лимит."""
+    sort_columns = ORDER_SORT_KEYS[order_by]
+    query = select(Order).where(*filters)
+    if after is not None:
+        query = query.where(tuple_(*sort_columns) > tuple_(*after))
+    query = query.order_by(*sort_columns)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _diff_products(existing: list, desired: List[Product]):
+    """Сопоставляет текущие строки продуктов с новым списком.
+
+    Продукты читаются в порядке id, поэтому строки назначаются так, чтобы id росли в порядке
+    нового списка: совпадающая по (name, price, quantity) строка остаётся как есть, иначе
+    под продукт переиспользуется ближайшая свободная строка с большим id, а когда таких
+    нет, продукт и все следующие за ним вставляются новыми строками. Лишние строки удаляются.
+    Возвращает пары (id, продукт) для UPDATE, продукты для INSERT и id для DELETE.
+    """
+    ids_by_key = defaultdict(list)
+    for row in existing:
+        ids_by_key[(row.name, row.price, row.quantity)].append(row.id)
+    free_ids = sorted(row.id for row in existing)
+
+    to_update, to_insert = [], []
+    last_id = 0
+    for index, product in enumerate(desired):
+        ids = ids_by_key.get((product.name, product.price, product.quantity), [])
+        product_id = next((i for i in ids if i > last_id and i in free_ids), None)
+        if product_id is None:
+            product_id = next((i for i in free_ids if i > last_id), None)
+            if product_id is None:
+                to_insert = desired[index:]
+                break
+            to_update.append((product_id, product))
+        product.id = product_id
+        free_ids.remove(product_id)
+        last_id = product_id
+    return to_update, to_insert, free_ids
+
+
+def _add_stats_delta(
+    deltas: StatsDelta, user_id: int, status: OrderStatus, count: int, revenue: int
+) -> None:
+    old_count, old_revenue = deltas.get((user_id, status), (0, 0))
+    deltas[(user_id, status)] = (old_count + count, old_revenue + revenue)
 
 
 class OrderRepository(BaseRepository):
@@ -11,18 +93,67 @@ class OrderRepository(BaseRepository):
         self.db = db
 
     async def create(self, order: Order) -> Order:
-        self.db.add(order)
+        """Создаёт заказ с продуктами: INSERT ... RETURNING для заказа и для продуктов, затем commit."""
+        created_order = (await self._insert_orders([order]))[0]
         await self.db.commit()
-        await self.db.refresh(order)
+        return created_order
 
-        result = await self.db.execute(
-            select(Order)
-            .options(selectinload(Order.products))
-            .where(Order.id == order.id)
-        )
-        order = result.scalar_one()
+    async def create_many(self, orders: List[Order]) -> List[Order]:
+        """Создаёт заказы и их продукты двумя многострочными INSERT ... RETURNING в одной транзакции."""
+        if not orders:
+            return []
+        created_orders = await self._insert_orders(orders)
+        await self.db.commit()
+        return created_orders
 
-        return order
+    async def _insert_orders(self, orders: List[Order]) -> List[Order]:
+        """Вставляет заказы и продукты без commit и собирает результат из возвращённых строк."""
+        created_orders = (
+            await self.db.scalars(
+                insert(Order).returning(Order, sort_by_parameter_order=True),
+                [
+                    {
+                        "customer_name": order.customer_name,
+                        "status": order.status,
+                        "total_price": order.total_price,
+                        "user_id": order.user_id,
+                    }
+                    for order in orders
+                ],
+            )
+        ).all()
+
+        product_rows = [
+            {
+                "name": product.name,
+                "price": product.price,
+                "quantity": product.quantity,
+                "order_id": created.id,
+                "order_created_at": created.created_at,
+            }
+            for created, order in zip(created_orders, orders)
+            for product in order.products
+        ]
+        products_by_order = defaultdict(list)
+        if product_rows:
+            created_products = await self.db.scalars(
+                insert(Product).returning(Product, sort_by_parameter_order=True),
+                product_rows,
+            )
+            for product in created_products:
+                products_by_order[product.order_id].append(product)
+
+        # Коллекция продуктов собирается из вставленных строк без повторного SELECT.
+        for created in created_orders:
+            set_committed_value(created, "products", products_by_order[created.id])
+
+        deltas: StatsDelta = {}
+        for created in created_orders:
+            _add_stats_delta(
+                deltas, created.user_id, created.status, 1, created.total_price
+            )
+        await self._apply_stats(deltas)
+        return created_orders
 
     async def get_by_id(self, order_id: int) -> Order:
         result = await self.db.execute(
@@ -33,19 +164,313 @@ class OrderRepository(BaseRepository):
         order = result.scalar_one_or_none()
         return order
 
-    async def update(self, order: Order) -> Order:
-        merged_order = await self.db.merge(order)
+    async def get_by_ids(self, order_ids: List[int]) -> List[Order]:
+        """Возвращает неудалённые заказы с продуктами по списку идентификаторов одним запросом."""
+        result = await self.db.execute(
+            select(Order)
+            .options(selectinload(Order.products))
+            .where(Order.id.in_(order_ids), Order.is_deleted == False)
+        )
+        return result.scalars().all()
+
+    async def update(self, order: Order) -> Optional[Order]:
+        """Обновляет заказ и меняет только те строки продуктов, которые отличаются от нового списка.
+
+        Возвращает None, если заказа уже нет в таблице (например, он перенесён в архив).
+        """
+        # Прежние статус и стоимость нужны для сводки, created_at — для ключа новых продуктов;
+        # строка блокируется до commit.
+        old = (
+            await self.db.execute(
+                select(
+                    Order.user_id,
+                    Order.status,
+                    Order.total_price,
+                    Order.is_deleted,
+                    Order.created_at,
+                )
+                .where(Order.id == order.id)
+                .with_for_update()
+            )
+        ).one_or_none()
+        if old is None:
+            await self.db.rollback()
+            return None
+        await self.db.execute(
+            update(Order)
+            .where(Order.id == order.id)
+            .values(
+                customer_name=order.customer_name,
+                status=order.status,
+                total_price=order.total_price,
+            )
+        )
+        existing = (
+            await self.db.execute(
+                select(Product.id, Product.name, Product.price, Product.quantity)
+                .where(Product.order_id == order.id)
+                .order_by(Product.id)
+            )
+        ).all()
+        to_update, to_insert, to_delete = _diff_products(existing, order.products)
+
+        if to_update:
+            await self.db.execute(
+                update(Product),
+                [
+                    {
+                        "id": product_id,
+                        "name": product.name,
+                        "price": product.price,
+                        "quantity": product.quantity,
+                    }
+                    for product_id, product in to_update
+                ],
+            )
+            for product_id, product in to_update:
+                product.id = product_id
+        if to_delete:
+            await self.db.execute(delete(Product).where(Product.id.in_(to_delete)))
+        if to_insert:
+            inserted_ids = await self.db.scalars(
+                insert(Product).returning(Product.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "name": product.name,
+                        "price": product.price,
+                        "quantity": product.quantity,
+                        "order_id": order.id,
+                        "order_created_at": old.created_at,
+                    }
+                    for product in to_insert
+                ],
+            )
+            for product, product_id in zip(to_insert, inserted_ids):
+                product.id = product_id
+        if not old.is_deleted:
+            deltas: StatsDelta = {}
+            _add_stats_delta(deltas, old.user_id, old.status, -1, -old.total_price)
+            _add_stats_delta(deltas, old.user_id, order.status, 1, order.total_price)
+            await self._apply_stats(deltas)
         await self.db.commit()
-        await self.db.refresh(merged_order)
         return order
 
     async def delete(self, order: Order) -> Order:
-        merged_order = await self.db.merge(order)
+        """Сохраняет флаг удаления заказа одним UPDATE, не затрагивая продукты.
+
+        Сводка меняется, только если флаг действительно изменился: повторное удаление её не трогает.
+        """
+        changed = (
+            await self.db.execute(
+                update(Order)
+                .where(Order.id == order.id, Order.is_deleted != order.is_deleted)
+                .values(
+                    is_deleted=order.is_deleted,
+                    deleted_at=func.now() if order.is_deleted else None,
+                )
+                .returning(Order.user_id, Order.status, Order.total_price)
+            )
+        ).one_or_none()
+        if changed is not None:
+            sign = -1 if order.is_deleted else 1
+            await self._apply_stats(
+                {
+                    (changed.user_id, changed.status): (
+                        sign,
+                        sign * changed.total_price,
+                    )
+                }
+            )
         await self.db.commit()
-        await self.db.refresh(merged_order)
         return order
 
-    async def get_all(self, filters: list):
-        query = select(Order).options(selectinload(Order.products)).where(*filters)
+    async def archive_deleted(self, deleted_before: datetime, batch_size: int) -> int:
+        """Переносит до batch_size заказов, удалённых раньше deleted_before, вместе с продуктами
+        в orders_archive/products_archive одной транзакцией и возвращает число перенесённых заказов.
+
+        Выбранные строки блокируются с SKIP LOCKED, поэтому архиваторы в разных процессах не мешают друг другу.
+        """
+        order_ids = (
+            await self.db.scalars(
+                select(Order.id)
+                .where(Order.is_deleted == True, Order.deleted_at < deleted_before)
+                .order_by(Order.deleted_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not order_ids:
+            await self.db.commit()
+            return 0
+
+        order_columns = [
+            "id",
+            "status",
+            "total_price",
+            "customer_name",
+            "user_id",
+            "created_at",
+            "updated_at",
+            "deleted_at",
+        ]
+        await self.db.execute(
+            insert(OrderArchive).from_select(
+                order_columns,
+                select(*(getattr(Order, c) for c in order_columns)).where(
+                    Order.id.in_(order_ids)
+                ),
+            )
+        )
+        product_columns = ["id", "name", "price", "quantity", "order_id"]
+        await self.db.execute(
+            insert(ProductArchive).from_select(
+                product_columns,
+                select(*(getattr(Product, c) for c in product_columns)).where(
+                    Product.order_id.in_(order_ids)
+                ),
+            )
+        )
+        await self.db.execute(delete(Product).where(Product.order_id.in_(order_ids)))
+        await self.db.execute(delete(Order).where(Order.id.in_(order_ids)))
+        await self.db.commit()
+        return len(order_ids)
+
+    async def get_archived_by_id(self, order_id: int) -> Optional[OrderArchive]:
+        """Возвращает заказ из архива с продуктами или None."""
+        result = await self.db.execute(
+            select(OrderArchive)
+            .options(selectinload(OrderArchive.products))
+            .where(OrderArchive.id == order_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def _apply_stats(self, deltas: StatsDelta) -> None:
+        """Прибавляет изменения к сводке order_stats и к итогам order_stats_totals без commit."""
+        totals: StatsDelta = {}
+        for (user_id, status), (count, revenue) in deltas.items():
+            _add_stats_delta(
+                totals, user_id % STATS_TOTAL_SHARDS, status, count, revenue
+            )
+        # Итоги всегда обновляются после строк пользователей, поэтому порядок блокировок
+        # у параллельных транзакций совпадает.
+        await self._upsert_stats(OrderStats, "user_id", deltas)
+        await self._upsert_stats(OrderStatsTotal, "shard", totals)
+
+    async def _upsert_stats(self, model, key: str, deltas: StatsDelta) -> None:
+        """Прибавляет изменения к строкам (key, статус) таблицы model одним INSERT ... ON CONFLICT DO UPDATE."""
+        rows = [
+            {key: key_value, "status": status, "count": count, "revenue": revenue}
+            for (key_value, status), (count, revenue) in sorted(
+                deltas.items(), key=lambda item: (item[0][0], item[0][1].value)
+            )
+            if count or revenue
+        ]
+        if not rows:
+            return
+        dialect = (
+            postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        )
+        stmt = dialect.insert(model)
+        # Строки упорядочены по ключу, чтобы параллельные транзакции блокировали их в одном порядке.
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[getattr(model, key), model.status],
+                set_={
+                    "count": model.count + stmt.excluded.count,
+                    "revenue": model.revenue + stmt.excluded.revenue,
+                },
+            ),
+            rows,
+        )
+
+    async def get_stats(
+        self, user_id: Optional[int] = None
+    ) -> Dict[OrderStatus, Tuple[int, int]]:
+        """Возвращает число и выручку неудалённых заказов по статусам из сводки: пользователя или всех пользователей.
+
+        Статистика всех пользователей читается из итогов order_stats_totals и не зависит от их числа.
+        """
+        if user_id is None:
+            query = select(
+                OrderStatsTotal.status,
+                func.sum(OrderStatsTotal.count),
+                func.sum(OrderStatsTotal.revenue),
+            ).group_by(OrderStatsTotal.status)
+        else:
+            query = select(
+                OrderStats.status, OrderStats.count, OrderStats.revenue
+            ).where(OrderStats.user_id == user_id)
         result = await self.db.execute(query)
+        return {status: (int(count), int(revenue)) for status, count, revenue in result}
+
+    async def rebuild_stats(self) -> int:
+        """Пересчитывает сводку order_stats и итоги order_stats_totals по таблице orders с нуля и возвращает число строк сводки.
+
+        В PostgreSQL обе таблицы блокируются на время пересчёта: параллельные изменения заказов
+        ждут его окончания и применяются уже к пересчитанным строкам.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            await self.db.execute(
+                text("LOCK TABLE order_stats, order_stats_totals IN EXCLUSIVE MODE")
+            )
+        await self.db.execute(delete(OrderStats))
+        await self.db.execute(delete(OrderStatsTotal))
+        result = await self.db.execute(
+            insert(OrderStats).from_select(
+                ["user_id", "status", "count", "revenue"],
+                select(
+                    Order.user_id,
+                    Order.status,
+                    func.count(),
+                    func.coalesce(func.sum(Order.total_price), 0),
+                )
+                .where(Order.is_deleted == False)
+                .group_by(Order.user_id, Order.status),
+            )
+        )
+        shard = OrderStats.user_id % STATS_TOTAL_SHARDS
+        await self.db.execute(
+            insert(OrderStatsTotal).from_select(
+                ["shard", "status", "count", "revenue"],
+                select(
+                    shard,
+                    OrderStats.status,
+                    func.sum(OrderStats.count),
+                    func.sum(OrderStats.revenue),
+                ).group_by(shard, OrderStats.status),
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def get_all(
+        self,
+        filters: list,
+        limit: Optional[int] = None,
+        order_by: str = "id",
+        after: Optional[List[int]] = None,
+    ):
+        """Возвращает заказы по фильтрам, упорядоченные по ключу сортировки и начиная строго после ключа after."""
+        query = build_orders_query(filters, limit=limit, order_by=order_by, after=after)
+        result = await self.db.execute(query.options(selectinload(Order.products)))
         return result.scalars().all()
+
+    async def stream_all(
+        self, filters: list, order_by: str = "id", batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator[Order]:
+        """Отдаёт заказы по фильтрам через серверный курсор пачками по batch_size, не накапливая их в сессии."""
+        query = (
+            build_orders_query(filters, order_by=order_by)
+            .options(selectinload(Order.products))
+            .execution_options(yield_per=batch_size)
+        )
+        # Потоковый ответ читается уже после выхода из зависимости get_async_session,
+        # поэтому соединение освобождается здесь, когда выборка дочитана или прервана.
+        try:
+            result = await self.db.stream(query)
+            async for partition in result.scalars().partitions():
+                for order in partition:
+                    yield order
+                self.db.expunge_all()
+        finally:
+            await self.db.close()
@@ -0,0 +1,23 @@
+import base64
+import binascii
+import json
+from typing import List, Tuple
+
+
+def encode_cursor(order_by: str, values: List[int]) -> str:
+    """Кодирует поле сортировки и ключ последней записи страницы в непрозрачный курсор."""
+    raw = json.dumps({"k": order_by, "v": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, List[int]]:
+    """Декодирует курсор в поле сортировки и ключ записи; при повреждённом курсоре поднимает ValueError."""
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        order_by, values = data["k"], data["v"]
+    except (ValueError, binascii.Error, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or not all(type(v) is int for v in values):
+        raise ValueError("Invalid cursor")
+    return order_by, values
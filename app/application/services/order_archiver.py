@@ -0,0 +1,40 @@
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+from app.application.repositories.order_repo import OrderRepository
+from app.application.services.order_service import OrderService
+from app.core import settings
+from app.core.logging import logger
+from app.infrastructure.db_connection import async_session_maker
+
+
+async def archive_deleted_orders(**overrides) -> int:
+    """Один проход архивации удалённых заказов с параметрами из настроек (их можно переопределить)."""
+    params = {
+        "older_than": timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS),
+        "batch_size": settings.ORDER_ARCHIVE_BATCH_SIZE,
+        "pause": settings.ORDER_ARCHIVE_BATCH_PAUSE,
+        **overrides,
+    }
+    async with async_session_maker() as session:
+        return await OrderService(OrderRepository(session)).archive_deleted_orders(
+            **params
+        )
+
+
+async def run_order_archiver(interval: float) -> None:
+    """Архивирует удалённые заказы каждые interval секунд; ошибка прохода логируется, следующий проход повторяет его."""
+    while True:
+        try:
+            await archive_deleted_orders()
+        except Exception:
+            logger.exception("Order archiving failed")
+        await asyncio.sleep(interval)
+
+
+def start_order_archiver() -> Optional[asyncio.Task]:
+    """Запускает фоновую архивацию, если задан ORDER_ARCHIVE_INTERVAL."""
+    if settings.ORDER_ARCHIVE_INTERVAL <= 0:
+        return None
+    return asyncio.create_task(run_order_archiver(settings.ORDER_ARCHIVE_INTERVAL))
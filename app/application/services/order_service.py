@@ -1,64 +1,203 @@
-from typing import Optional
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Tuple, AsyncIterator, Dict, Iterable
 
-from app.application.repositories.order_repo import OrderRepository
-from app.domain.models import Order
+from redis.exceptions import RedisError
+
+from app.application.repositories.order_repo import OrderRepository, ORDER_SORT_KEYS
+from app.application.services.cursor import encode_cursor, decode_cursor
+from app.domain.models import Order, OrderArchive
 from app.domain.models.order import OrderStatus
+from app.core import settings
 from app.core.logging import logger
 from app.infrastructure.redis_cache import (
-    set_order_cache,
-    delete_order_cache,
-    get_order_cache,
+    schedule_order_cache,
+    schedule_orders_cache,
+    invalidate_orders_cache,
+    get_order_cache_with_ttl,
+    get_orders_cache,
+    acquire_order_lock,
+    release_order_lock,
+    wait_for_order_cache,
+    get_list_scope,
+    get_orders_list_cache,
+    schedule_orders_list_cache,
 )
+from app.infrastructure.stampede import SingleFlight, EarlyRefresh
 from app.presentation.mappers.order_mapper import (
     map_order_to_cache_data,
     map_cache_to_order,
 )
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Загрузки заказов из БД при промахе кэша, общие для всех запросов воркера.
+order_loads = SingleFlight()
+order_early_refresh = EarlyRefresh(settings.ORDER_CACHE_EARLY_REFRESH_BETA)
+
 
 class OrderService:
-    def __init__(self, repository: OrderRepository):
+    def __init__(self, repository: OrderRepository, read_cache: bool = True):
+        # read_cache=False — чтение мимо общего кэша: его могли заполнить с отстающей
+        # реплики, а пользователь, только что изменивший заказы, должен видеть свои изменения.
+        # Прочитанное из основной БД по-прежнему записывается в кэш.
         self.repository = repository
+        self.read_cache = read_cache
 
     async def create_order(self, order: Order) -> Order:
         """Создает заказ, вычисляет его общую стоимость, сохраняет в БД, кэширует и логирует создание."""
         order.total_price = sum(p.price * p.quantity for p in order.products)
         created_order = await self.repository.create(order)
-        order_data = map_order_to_cache_data(created_order)
         logger.info(f"User {created_order.user_id} created order {created_order.id}")
-        await set_order_cache(created_order.id, order_data)
+        await self._invalidate_cache(created_order.user_id)
+        schedule_order_cache(created_order.id, map_order_to_cache_data(created_order))
 
         return created_order
 
-    async def update_order(self, order: Order) -> Order:
-        """Обновляет заказ, пересчитывает его общую стоимость, сохраняет изменения, обновляет кэш и логирует обновление."""
+    async def create_orders(self, orders: List[Order]) -> List[Order]:
+        """Создает несколько заказов одной транзакцией, кэширует их одним пайплайном и логирует создание."""
+        for order in orders:
+            order.total_price = sum(p.price * p.quantity for p in order.products)
+        created_orders = await self.repository.create_many(orders)
+        if created_orders:
+            logger.info(
+                f"User {created_orders[0].user_id} created {len(created_orders)} orders in bulk"
+            )
+            await self._invalidate_cache(created_orders[0].user_id)
+            schedule_orders_cache(
+                {order.id: map_order_to_cache_data(order) for order in created_orders}
+            )
+
+        return created_orders
+
+    async def update_order(
+        self, order: Order, writer_id: Optional[int] = None
+    ) -> Optional[Order]:
+        """Обновляет заказ, пересчитывает его общую стоимость, сохраняет изменения, обновляет кэш и логирует обновление.
+
+        writer_id — пользователь, который вносит изменение (владелец или администратор).
+        Возвращает None, если заказа уже нет в БД.
+        """
         order.total_price = sum(p.price * p.quantity for p in order.products)
         updated_order = await self.repository.update(order)
-        order_data = map_order_to_cache_data(updated_order)
+        if updated_order is None:
+            # Заказ мог быть прочитан из кэша уже после переноса в архив.
+            await self._invalidate_cache(order.user_id, [order.id], writer_id)
+            return None
         logger.info(f"User {updated_order.user_id} updated order {updated_order.id}")
-        await set_order_cache(updated_order.id, order_data)
+        await self._invalidate_cache(
+            updated_order.user_id, [updated_order.id], writer_id
+        )
+        schedule_order_cache(updated_order.id, map_order_to_cache_data(updated_order))
 
         return updated_order
 
     async def get_order_by_id(self, order_id: int) -> Optional[Order]:
         """Получает заказ по идентификатору, кэширует его данные и возвращает заказ, если он найден."""
-        cached_data = await get_order_cache(order_id)
-        if cached_data:
-            # Если данные найдены в кэше, мапим их в объект заказа
-            return map_cache_to_order(cached_data)
-        order = await self.repository.get_by_id(order_id)
-        if order:
+        order_data = await self.get_order_data(order_id)
+        if order_data:
+            # Мапим данные из кэша в объект заказа
+            return map_cache_to_order(order_data)
+        return None
+
+    async def get_order_data(self, order_id: int) -> Optional[dict]:
+        """Возвращает данные заказа в формате кэша, при попадании в кэш не создавая ORM-объектов.
+
+        При промахе кэша заказ загружает из БД только один запрос воркера, остальные ждут его результат.
+        Незадолго до истечения TTL запись может быть обновлена досрочно.
+        """
+        if not self.read_cache:
+            # Общую загрузку мог начать читатель реплики, поэтому у этой своя.
+            return await order_loads.do(
+                ("primary", order_id), lambda: self._load_order_data(order_id)
+            )
+        cached_data, ttl = await get_order_cache_with_ttl(order_id)
+        if cached_data and (
+            not order_early_refresh.should_refresh(ttl)
+            or order_loads.in_flight(order_id)
+        ):
+            return cached_data
+        return await order_loads.do(order_id, lambda: self._load_order_data(order_id))
+
+    async def get_orders_data(self, order_ids: List[int]) -> Dict[int, dict]:
+        """Возвращает данные нескольких заказов: кэш читается одним MGET, промахи загружаются одним запросом к БД."""
+        orders_data = await get_orders_cache(order_ids) if self.read_cache else {}
+        missing = [order_id for order_id in order_ids if order_id not in orders_data]
+        if missing:
+            loaded = {
+                order.id: map_order_to_cache_data(order)
+                for order in await self.repository.get_by_ids(missing)
+            }
+            if loaded:
+                schedule_orders_cache(loaded)
+            orders_data.update(loaded)
+        return orders_data
+
+    async def _load_order_data(self, order_id: int) -> Optional[dict]:
+        """Загружает заказ из БД и кэширует его. При включённой блокировке в Redis загрузку выполняет один процесс."""
+        # Ожидание блокировки закончилось бы чтением кэша, который нужно обойти.
+        lock_timeout = settings.ORDER_CACHE_LOCK_TIMEOUT if self.read_cache else 0
+        token = None
+        if lock_timeout > 0:
+            try:
+                token = await acquire_order_lock(order_id, lock_timeout)
+            except RedisError as e:
+                # Без Redis блокировка невозможна: грузим из БД, как при выключенной блокировке.
+                logger.warning(f"Order {order_id} lock failed: {e}")
+                token = False
+            if token is None:
+                cached_data = await wait_for_order_cache(order_id, lock_timeout)
+                if cached_data:
+                    return cached_data
+        try:
+            started = time.perf_counter()
+            order = await self.repository.get_by_id(order_id)
+            order_early_refresh.record_load_time(time.perf_counter() - started)
+            if not order:
+                return None
             order_data = map_order_to_cache_data(order)
-            await set_order_cache(order.id, order_data)
-        return order
+            schedule_order_cache(order.id, order_data)
+            return order_data
+        finally:
+            if token:
+                try:
+                    await release_order_lock(order_id, token)
+                except RedisError as e:
+                    # Блокировка истечёт сама по таймауту.
+                    logger.warning(f"Order {order_id} lock release failed: {e}")
 
-    async def get_orders(
-        self,
-        user_id: int,
-        status: Optional[str] = None,
-        min_price: Optional[float] = None,
-        max_price: Optional[float] = None,
-    ):
-        """Возвращает список заказов, отфильтрованных по пользователю, статусу и диапазону цен."""
+    @staticmethod
+    async def _invalidate_cache(
+        user_id: int, order_ids: Iterable[int] = (), writer_id: Optional[int] = None
+    ) -> None:
+        """Сбрасывает кэш изменённых заказов и списков до ответа клиенту и, если есть реплика,
+        на время закрепляет чтения автора изменения (по умолчанию владельца заказов) за основной БД.
+
+        Изменение уже сохранено в БД, поэтому ошибка Redis не превращается в ошибку запроса.
+        """
+        try:
+            pin_seconds = (
+                settings.DB_READ_PIN_SECONDS if settings.POSTGRES_READ_HOST else 0
+            )
+            await invalidate_orders_cache(user_id, order_ids, pin_seconds, writer_id)
+        except RedisError as e:
+            logger.error(f"Cache invalidation for user {user_id} failed: {e}")
+
+    @staticmethod
+    def _build_filters(
+        user_id: Optional[int],
+        status: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> list:
+        """Собирает условия выборки заказов по пользователю, статусу, диапазону цен и времени создания.
+
+        Интервал [created_from, created_to) полуоткрытый; по нему PostgreSQL отбрасывает лишние секции orders.
+        """
         enum_status = OrderStatus(status) if status else None
         filters = [Order.is_deleted == False]
         if user_id:
@@ -69,14 +208,154 @@ class OrderService:
             filters.append(Order.total_price >= min_price)
         if max_price:
             filters.append(Order.total_price <= max_price)
+        if created_from:
+            filters.append(Order.created_at >= created_from)
+        if created_to:
+            filters.append(Order.created_at < created_to)
+        return filters
+
+    async def get_orders(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        order_by: str = "id",
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Возвращает страницу заказов в формате кэша, отфильтрованных по пользователю, статусу, диапазону цен и времени создания, и курсор следующей страницы.
+
+        Страницы кэшируются в Redis до следующего изменения заказов пользователя.
+        """
+        if order_by not in ORDER_SORT_KEYS:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        after = None
+        if cursor:
+            cursor_order_by, after = decode_cursor(cursor)
+            if cursor_order_by != order_by or len(after) != len(
+                ORDER_SORT_KEYS[order_by]
+            ):
+                raise ValueError("Invalid cursor")
+
+        filters = self._build_filters(
+            user_id, status, min_price, max_price, created_from, created_to
+        )
+
+        cache_ttl = settings.ORDER_LIST_CACHE_TTL if self.read_cache else 0
+        if cache_ttl > 0:
+            scope = get_list_scope(user_id)
+            params = {
+                "status": status or None,
+                "min_price": float(min_price) if min_price else None,
+                "max_price": float(max_price) if max_price else None,
+                "created_from": created_from.isoformat() if created_from else None,
+                "created_to": created_to.isoformat() if created_to else None,
+                "limit": limit,
+                "cursor": cursor or None,
+                "order_by": order_by,
+            }
+            page, version = await get_orders_list_cache(scope, params)
+            if page is not None:
+                return page["items"], page["next_cursor"]
+
+        # Запрашиваем на одну запись больше, чтобы понять, есть ли следующая страница.
+        orders = await self.repository.get_all(
+            filters, limit=limit + 1, order_by=order_by, after=after
+        )
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            last = orders[-1]
+            next_cursor = encode_cursor(
+                order_by, [getattr(last, c.key) for c in ORDER_SORT_KEYS[order_by]]
+            )
+        items = [map_order_to_cache_data(order) for order in orders]
+
+        if cache_ttl > 0 and version is not None:
+            schedule_orders_list_cache(
+                scope,
+                params,
+                version,
+                {"items": items, "next_cursor": next_cursor},
+                cache_ttl,
+            )
+        return items, next_cursor
+
+    def stream_orders(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        order_by: str = "id",
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> AsyncIterator[Order]:
+        """Возвращает поток всех заказов по фильтрам без разбиения на страницы (для выгрузок)."""
+        if order_by not in ORDER_SORT_KEYS:
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        filters = self._build_filters(
+            user_id, status, min_price, max_price, created_from, created_to
+        )
+        return self.repository.stream_all(filters, order_by=order_by)
+
+    async def get_stats(
+        self, user_id: Optional[int] = None
+    ) -> Dict[OrderStatus, Tuple[int, int]]:
+        """Возвращает число и выручку заказов по каждому статусу (нули для статусов без заказов) из сводки order_stats."""
+        stats = await self.repository.get_stats(user_id)
+        return {status: stats.get(status, (0, 0)) for status in OrderStatus}
+
+    async def rebuild_stats(self) -> int:
+        """Пересчитывает сводку order_stats с нуля, исправляя возможное расхождение с заказами."""
+        rows = await self.repository.rebuild_stats()
+        logger.info(f"Order stats rebuilt: {rows} rows")
+        return rows
+
+    async def archive_deleted_orders(
+        self,
+        older_than: timedelta,
+        batch_size: int,
+        pause: float = 0,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """Переносит в архив заказы, удалённые раньше чем older_than назад, транзакциями по batch_size заказов.
+
+        Между транзакциями делается пауза pause секунд, чтобы архивация не нагружала БД подряд.
+        Возвращает число перенесённых заказов.
+        """
+        deleted_before = datetime.now(timezone.utc) - older_than
+        archived = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = await self.repository.archive_deleted(deleted_before, batch_size)
+            archived += count
+            batches += 1
+            if count < batch_size:
+                break
+            await asyncio.sleep(pause)
+        if archived:
+            logger.info(f"Archived {archived} deleted orders in {batches} batches")
+        return archived
+
+    async def get_archived_order(self, order_id: int) -> Optional[OrderArchive]:
+        """Возвращает заказ из архива удалённых заказов или None."""
+        return await self.repository.get_archived_by_id(order_id)
 
-        return await self.repository.get_all(filters)
+    async def soft_delete_order(
+        self, order: Order, writer_id: Optional[int] = None
+    ) -> Order:
+        """Мягко удаляет заказ, устанавливая флаг удаления, удаляет его из кэша и логирует событие.
 
-    async def soft_delete_order(self, order: Order) -> Order:
-        """Мягко удаляет заказ, устанавливая флаг удаления, удаляет его из кэша и логирует событие."""
+        writer_id — пользователь, который удаляет заказ (владелец или администратор).
+        """
         order.is_deleted = True
         deleted_order = await self.repository.delete(order)
-        await delete_order_cache(deleted_order.id)
+        await self._invalidate_cache(
+            deleted_order.user_id, [deleted_order.id], writer_id
+        )
         logger.info(f"User {deleted_order.user_id} deleted order {deleted_order.id}")
 
         return deleted_order
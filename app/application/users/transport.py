@@ -1,16 +1,74 @@
+from typing import Optional
+
+import jwt
+from fastapi_users import exceptions
 from fastapi_users.authentication import (
     BearerTransport,
     JWTStrategy,
     AuthenticationBackend,
 )
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from fastapi_users.manager import BaseUserManager
 
 from app.core import settings
+from app.domain.models import User
+from app.infrastructure.redis_cache import get_user_cache, schedule_user_cache
+from app.presentation.mappers.user_mapper import (
+    map_user_to_cache_data,
+    map_cache_to_user,
+)
+
+# Claim с данными пользователя в токене при AUTH_TOKEN_CLAIMS.
+USER_CLAIM = "usr"
 
 bearer_transport = BearerTransport(tokenUrl="auth/login")
 
 
+class CachedJWTStrategy(JWTStrategy[User, int]):
+    """JWT-стратегия, которая берёт пользователя из подписанных claims токена или из кэша, а не из БД на каждый запрос."""
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[User, int]
+    ) -> Optional[User]:
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+            user_id = user_manager.parse_id(data["sub"])
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            return None
+
+        if settings.AUTH_TOKEN_CLAIMS and USER_CLAIM in data:
+            return map_cache_to_user(data[USER_CLAIM])
+
+        cache_ttl = settings.AUTH_USER_CACHE_TTL
+        if cache_ttl > 0:
+            user_data = await get_user_cache(user_id)
+            if user_data is not None:
+                return map_cache_to_user(user_data)
+
+        try:
+            user = await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+        if cache_ttl > 0:
+            schedule_user_cache(user.id, map_user_to_cache_data(user), cache_ttl)
+        return user
+
+    async def write_token(self, user: User) -> str:
+        data = {"sub": str(user.id), "aud": self.token_audience}
+        if settings.AUTH_TOKEN_CLAIMS:
+            data[USER_CLAIM] = map_user_to_cache_data(user)
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm
+        )
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=settings.SECRET_KEY, lifetime_seconds=3600)
+    return CachedJWTStrategy(secret=settings.SECRET_KEY, lifetime_seconds=3600)
 
 
 auth_backend = AuthenticationBackend(
@@ -1,18 +1,103 @@
+from typing import Any, Dict, Optional
+
 from fastapi import Depends, Request
-from fastapi_users import IntegerIDMixin, BaseUserManager
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import IntegerIDMixin, BaseUserManager, exceptions, schemas
+from redis.exceptions import RedisError
 
 from app.core import settings
+from app.core.logging import logger
 from app.domain.models import User
+from app.infrastructure.password_hashing import password_hash_pool
+from app.infrastructure.redis_cache import delete_user_cache
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     """Менеджер пользователей с поддержкой регистрации, сброса пароля и верификации."""
+
     reset_password_token_secret = settings.SECRET_KEY
     verification_token_secret = settings.SECRET_KEY
 
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        """Создаёт пользователя, вычисляя хэш пароля в пуле потоков."""
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await password_hash_pool.hash(password)
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        """Проверяет email и пароль; пароль проверяется в пуле потоков."""
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хэшируем пароль и для несуществующего пользователя, чтобы время ответа не выдавало email.
+            await password_hash_pool.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_hash_pool.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        """Обновляет пользователя, вычисляя хэш нового пароля в пуле потоков."""
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {
+                field: value
+                for field, value in update_dict.items()
+                if field != "password"
+            }
+            update_dict["hashed_password"] = await password_hash_pool.hash(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self, user: User, request: Request):
         print(f"Пользователь {user.id} зарегистрирован.")
 
+    async def on_after_update(
+        self, user: User, update_dict: Dict[str, Any], request: Optional[Request] = None
+    ):
+        await self._invalidate_user_cache(user)
+
+    async def on_after_verify(self, user: User, request: Optional[Request] = None):
+        await self._invalidate_user_cache(user)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        await self._invalidate_user_cache(user)
+
+    @staticmethod
+    async def _invalidate_user_cache(user: User):
+        """Удаляет пользователя из кэша аутентификации, чтобы изменения (например, деактивация) действовали сразу."""
+        try:
+            await delete_user_cache(user.id)
+        except RedisError as e:
+            logger.error(f"User {user.id} cache invalidation failed: {e}")
+
 
 async def get_user_manager(user_db=Depends(User.get_user_db)):
     yield UserManager(user_db)
@@ -0,0 +1,97 @@
+"""Служебные команды приложения.
+
+Запуск: python -m app.cli <команда>
+    rebuild-stats — пересчитать сводку order_stats по таблице orders
+    create-partitions [--months 3] — создать месячные секции orders заранее
+    archive-orders [--days N] [--batch-size N] [--pause S] [--max-batches N] — перенести
+        давно удалённые заказы в архив (по умолчанию параметры из настроек)
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.application.repositories.order_repo import OrderRepository
+from app.application.services.order_archiver import archive_deleted_orders
+from app.application.services.order_service import OrderService
+from app.infrastructure.db_connection import async_session_maker, engine
+from app.infrastructure.partitions import create_order_partitions
+
+
+async def rebuild_stats(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        rows = await OrderService(OrderRepository(session)).rebuild_stats()
+    print(f"Сводка order_stats пересчитана: {rows} строк")
+
+
+async def create_partitions(args: argparse.Namespace) -> None:
+    async with engine.begin() as conn:
+        created = await create_order_partitions(conn, args.months)
+    print(f"Создано секций: {len(created)} {' '.join(created)}")
+
+
+async def archive_orders(args: argparse.Namespace) -> None:
+    overrides = {}
+    if args.days is not None:
+        overrides["older_than"] = timedelta(days=args.days)
+    if args.batch_size is not None:
+        overrides["batch_size"] = args.batch_size
+    if args.pause is not None:
+        overrides["pause"] = args.pause
+    archived = await archive_deleted_orders(max_batches=args.max_batches, **overrides)
+    print(f"Перенесено в архив заказов: {archived}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        await args.handler(args)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    command = subparsers.add_parser(
+        "rebuild-stats", help="пересчитать сводку order_stats с нуля"
+    )
+    command.set_defaults(handler=rebuild_stats)
+
+    command = subparsers.add_parser(
+        "create-partitions", help="создать месячные секции orders заранее"
+    )
+    command.add_argument(
+        "--months",
+        type=int,
+        default=3,
+        help="на сколько месяцев вперёд от текущего создать секции",
+    )
+    command.set_defaults(handler=create_partitions)
+
+    command = subparsers.add_parser(
+        "archive-orders", help="перенести давно удалённые заказы в архив"
+    )
+    command.add_argument(
+        "--days",
+        type=int,
+        help="сколько дней назад удалён заказ (ORDER_ARCHIVE_AFTER_DAYS)",
+    )
+    command.add_argument(
+        "--batch-size", type=int, help="заказов в транзакции (ORDER_ARCHIVE_BATCH_SIZE)"
+    )
+    command.add_argument(
+        "--pause",
+        type=float,
+        help="пауза между транзакциями, с (ORDER_ARCHIVE_BATCH_PAUSE)",
+    )
+    command.add_argument(
+        "--max-batches", type=int, help="остановиться после стольких транзакций"
+    )
+    command.set_defaults(handler=archive_orders)
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
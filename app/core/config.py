@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv, find_dotenv
 
@@ -11,10 +13,78 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
 
+    # Пул соединений с БД; по умолчанию значения SQLAlchemy, кроме пересоздания соединений раз в 30 минут.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    # Ожидание соединения дольше этого (в секундах) логируется; 0 — не логировать.
+    DB_POOL_SLOW_CHECKOUT: float = 0.1
+    # Размер кэша подготовленных выражений asyncpg на соединение; 0 — выключен (нужно за PgBouncer).
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Реплика для чтения заказов (те же пользователь и база); не задана — все запросы идут в основную БД.
+    POSTGRES_READ_HOST: Optional[str] = None
+    POSTGRES_READ_PORT: Optional[int] = None
+    # Сколько секунд после записи пользователь читает из основной БД, чтобы не увидеть отставание реплики.
+    DB_READ_PIN_SECONDS: float = 5.0
+    # Журнал медленных запросов (порог в секундах, 0 — выключен), предупреждение о N+1, когда одно
+    # выражение выполнено за HTTP-запрос столько раз (0 — выключено), и заголовок Server-Timing.
+    SQL_SLOW_QUERY_SECONDS: float = 0.5
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+    SERVER_TIMING: bool = False
+
+    # Логирование: формат (text или json), длина очереди записей (при переполнении записи отбрасываются)
+    # и файл журнала; пустая строка — писать только в консоль.
+    LOG_FORMAT: str = "text"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_FILE: str = "app/orders.log"
+
     SECRET_KEY: str
     REDIS_HOST:str
     REDIS_PORT: str
 
+    # Локальный (в памяти воркера) кэш заказов перед Redis; 0 — выключен.
+    ORDER_L1_CACHE_SIZE: int = 0
+    ORDER_L1_CACHE_TTL: float = 5.0
+    # Кодек записей кэша заказов: json, orjson или msgpack.
+    ORDER_CACHE_SERIALIZER: str = "json"
+    # Время жизни кэша страниц списка заказов в секундах; 0 — списки не кэшируются.
+    ORDER_LIST_CACHE_TTL: int = 60
+
+    # Фоновая запись в кэш: максимальная длина очереди и размер пайплайна.
+    CACHE_WRITE_QUEUE_SIZE: int = 10000
+    CACHE_WRITE_BATCH_SIZE: int = 100
+    # Сколько секунд запрос ждёт записи переполненной очереди перед прямым удалением из кэша.
+    CACHE_WRITE_FLUSH_TIMEOUT: float = 0.5
+
+    # Защита от одновременного промаха кэша по популярному заказу:
+    # время жизни межпроцессной блокировки в Redis (0 — только блокировка внутри процесса)
+    # и коэффициент досрочного обновления записей (0 — выключено).
+    ORDER_CACHE_LOCK_TIMEOUT: float = 0
+    ORDER_CACHE_EARLY_REFRESH_BETA: float = 1.0
+
+    # Кэш пользователей для аутентификации: время жизни записи в Redis в секундах (0 — выключен)
+    # и локальный кэш воркера (0 — выключен; изменения доходят до других воркеров через его TTL).
+    AUTH_USER_CACHE_TTL: int = 300
+    AUTH_USER_L1_CACHE_SIZE: int = 0
+    AUTH_USER_L1_CACHE_TTL: float = 5.0
+    # Подписывать флаги пользователя в токене и не читать пользователя вовсе;
+    # деактивация тогда вступает в силу только по истечении токена.
+    AUTH_TOKEN_CLAIMS: bool = False
+    # Хэширование паролей в пуле потоков: число потоков и сколько операций может ждать сверх них
+    # (остальные запросы получают 503).
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    # Архивация удалённых заказов: через сколько дней после удаления заказ переносится в архив,
+    # сколько заказов переносится одной транзакцией и пауза между транзакциями в секундах.
+    ORDER_ARCHIVE_AFTER_DAYS: int = 30
+    ORDER_ARCHIVE_BATCH_SIZE: int = 500
+    ORDER_ARCHIVE_BATCH_PAUSE: float = 0.5
+    # Период фоновой архивации внутри приложения в секундах; 0 — только командой app.cli archive-orders.
+    ORDER_ARCHIVE_INTERVAL: float = 0
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,36 +1,87 @@
-import logging.config
-
-
-# Настраиваем логирование с использованием словаря конфигурации: вывод в файл и консоль.
-
-log_file='app/orders.log'
-
-logging.config.dictConfig({
-    'version': 1,
-    'disable_existing_loggers': False,
-    'formatters': {
-         'default': {
-              'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-         },
-    },
-    'handlers': {
-         'file': {
-              'level': 'INFO',
-              'class': 'logging.FileHandler',
-              'filename': log_file,
-              'formatter': 'default',
-         },
-         'console': {
-              'class': 'logging.StreamHandler',
-              'formatter': 'default',
-         },
-    },
-    'loggers': {
-         'orders': {
-              'handlers': ['file', 'console'],
-              'level': 'INFO',
-              'propagate': True,
-         },
-    },
-})
-logger = logging.getLogger("orders")
\ No newline at end of file
+import atexit
+import json
+import logging
+import queue
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Tuple
+
+from .config import settings
+
+
+# Идентификатор текущего HTTP-запроса и момент его начала (time.perf_counter()).
+request_context: ContextVar[Optional[Tuple[str, float]]] = ContextVar('request_context', default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    """Добавляет к записи идентификатор запроса и время от его начала в миллисекундах."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context is not None:
+            record.request_id, started = context
+            record.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись как одну JSON-строку с полями запроса, если они есть."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in ('request_id', 'elapsed_ms'):
+            if hasattr(record, field):
+                data[field] = getattr(record, field)
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler с ограниченной очередью: при переполнении запись отбрасывается, а не блокирует поток."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Настраиваем логирование: вывод в файл (если задан LOG_FILE) и консоль. Файл и консоль
+# пишет фоновый поток QueueListener, чтобы запись на диск не блокировала цикл событий.
+
+if settings.LOG_FORMAT == 'json':
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(formatter)
+handlers = [console_handler]
+
+if settings.LOG_FILE:
+    file_handler = logging.FileHandler(settings.LOG_FILE)
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(formatter)
+    handlers.insert(0, file_handler)
+
+queue_handler = DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+queue_handler.addFilter(RequestContextFilter())
+
+logger = logging.getLogger("orders")
+logger.setLevel(logging.INFO)
+logger.addHandler(queue_handler)
+
+log_listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
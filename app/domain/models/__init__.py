@@ -2,3 +2,5 @@ from .base import Base
 from .product import Product
 from .order import Order
 from .user import User
+from .order_stats import OrderStats, OrderStatsTotal
+from .archive import OrderArchive, ProductArchive
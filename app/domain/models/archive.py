@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, String, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.domain.models import Base
+from app.domain.models.order import OrderStatus
+
+
+class OrderArchive(Base):
+    """Удалённый заказ, перенесённый из orders архиватором; идентификатор сохраняется прежним."""
+
+    __tablename__ = "orders_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), nullable=False)
+    total_price: Mapped[int]
+    customer_name: Mapped[str] = mapped_column(String, nullable=False)
+    user_id: Mapped[int] = mapped_column(index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    products = relationship(
+        "ProductArchive",
+        primaryjoin="OrderArchive.id == foreign(ProductArchive.order_id)",
+        # id продуктов переносятся прежними, поэтому порядок совпадает с порядком до архивации.
+        order_by="ProductArchive.id",
+        viewonly=True,
+    )
+
+
+class ProductArchive(Base):
+    """Продукт удалённого заказа, перенесённый из products вместе с заказом."""
+
+    __tablename__ = "products_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    name: Mapped[str]
+    price: Mapped[int]
+    quantity: Mapped[int]
+    order_id: Mapped[int] = mapped_column(index=True)
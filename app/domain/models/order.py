@@ -1,6 +1,8 @@
 import enum
+from datetime import datetime
+from typing import Optional
 
-from sqlalchemy import Enum, String, ForeignKey
+from sqlalchemy import DateTime, Enum, String, ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.domain.models import Base
@@ -15,7 +17,11 @@ class OrderStatus(enum.Enum):
 
 
 class Order(Base):
-    """Модель заказа с полями для статуса, общей стоимости, флага удаления, имени клиента, связи с пользователем и продуктами."""
+    """Модель заказа с полями для статуса, общей стоимости, флага удаления, имени клиента, связи с пользователем и продуктами.
+
+    В PostgreSQL таблица orders секционирована по месяцам created_at, и её первичный ключ — (id, created_at);
+    id по-прежнему уникален благодаря последовательности, поэтому в ORM ключом остаётся id.
+    """
 
     status: Mapped[OrderStatus] = mapped_column(
         Enum(OrderStatus), default=OrderStatus.PENDING
@@ -24,7 +30,67 @@ class Order(Base):
     is_deleted: Mapped[bool] = mapped_column(default=False, nullable=False)
     customer_name: Mapped[str] = mapped_column(String, nullable=False)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    # Момент мягкого удаления; по нему удалённые заказы переносятся в orders_archive.
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
+    # Внешний ключ products — (order_id, order_created_at), но id заказа уникален,
+    # поэтому продукты загружаются по одному order_id.
     products = relationship(
-        "Product", back_populates="order", cascade="all, delete-orphan"
+        "Product",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        primaryjoin="Order.id == foreign(Product.order_id)",
+        # Порядок продуктов — порядок их строк; в нём же они лежат в кэше и в ответах API.
+        order_by="Product.id",
+    )
+
+    # Частичные индексы под фильтры списка заказов: удалённые заказы в них не попадают.
+    __table_args__ = (
+        Index(
+            "ix_orders_active_user_id_id",
+            "user_id",
+            "id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_orders_active_user_id_status_total_price",
+            "user_id",
+            "status",
+            "total_price",
+            "id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_orders_active_status_total_price",
+            "status",
+            "total_price",
+            "id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_orders_active_total_price",
+            "total_price",
+            "id",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_orders_active_user_id_created_at",
+            "user_id",
+            "created_at",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_orders_deleted_deleted_at",
+            "deleted_at",
+            postgresql_where=text("is_deleted"),
+        ),
     )
@@ -0,0 +1,47 @@
+from sqlalchemy import BigInteger, Enum, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.domain.models import Base
+from app.domain.models.order import OrderStatus
+
+
+class OrderStats(Base):
+    """Сводка по неудалённым заказам пользователя в одном статусе: число заказов и их общая стоимость.
+
+    Строки обновляются в той же транзакции, что и сами заказы, поэтому статистика читается без сканирования orders.
+    """
+
+    __tablename__ = "order_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), nullable=False)
+    count: Mapped[int] = mapped_column(default=0, nullable=False)
+    revenue: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "status", name="uq_order_stats_user_id_status"),
+    )
+
+
+# Число строк итогов на статус: изменения разных пользователей попадают в разные
+# строки и реже ждут друг друга. После изменения нужен пересчёт сводки.
+STATS_TOTAL_SHARDS = 16
+
+
+class OrderStatsTotal(Base):
+    """Итоги по неудалённым заказам всех пользователей в одном статусе, разбитые на STATS_TOTAL_SHARDS строк.
+
+    Пользователь попадает в строку user_id % STATS_TOTAL_SHARDS; общая статистика читает
+    не больше STATS_TOTAL_SHARDS строк на статус вместо строк всех пользователей.
+    """
+
+    __tablename__ = "order_stats_totals"
+
+    shard: Mapped[int] = mapped_column(nullable=False)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), nullable=False)
+    count: Mapped[int] = mapped_column(default=0, nullable=False)
+    revenue: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("shard", "status", name="uq_order_stats_totals_shard_status"),
+    )
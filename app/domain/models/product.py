@@ -1,15 +1,39 @@
-from sqlalchemy import ForeignKey
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKeyConstraint
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from app.domain.models import Base
 
 
 class Product(Base):
-    """Модель продукта, входящего в заказ, с полями для названия, цены, количества и ссылкой на заказ."""
+    """Модель продукта, входящего в заказ, с полями для названия, цены, количества и ссылкой на заказ.
+
+    Ключ секционированной таблицы orders — (id, created_at), поэтому внешний ключ продукта
+    составной: order_created_at повторяет created_at заказа и заполняется репозиторием при вставке.
+    """
 
     name: Mapped[str]
     price: Mapped[int]
     quantity: Mapped[int]
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"))
+    order_id: Mapped[int] = mapped_column(index=True)
+    order_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    order = relationship(
+        "Order",
+        back_populates="products",
+        primaryjoin="Order.id == foreign(Product.order_id)",
+    )
 
-    order = relationship("Order", back_populates="products")
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+            name="products_order_id_order_created_at_fkey",
+            # Откладывается на время переноса заказов между секциями (create_order_partition).
+            deferrable=True,
+            initially="IMMEDIATE",
+        ),
+    )
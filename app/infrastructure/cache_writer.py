@@ -0,0 +1,108 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+
+from app.core.logging import logger
+
+CacheWrite = Callable[[Pipeline], None]
+
+# Как часто (в штуках) повторять предупреждение о переполнении очереди.
+DROP_LOG_EVERY = 1000
+
+
+class CacheWriteQueue:
+    """Ограниченная очередь записей в кэш, которую фоновая задача сбрасывает в Redis пайплайнами.
+
+    Запись в очередь не ждёт Redis: при переполнении команда отбрасывается и учитывается
+    в счётчике dropped. Фоновая задача запускается при первой записи в текущем цикле событий.
+    """
+
+    def __init__(self, redis: Redis, max_size: int, batch_size: int):
+        self.redis = redis
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def put(self, write: CacheWrite) -> bool:
+        """Ставит команду записи в очередь; возвращает False, если очередь переполнена."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(write)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % DROP_LOG_EVERY == 1:
+                logger.warning(
+                    f"Cache write queue is full ({self.max_size}), dropped {self.dropped} writes"
+                )
+            return False
+        return True
+
+    async def flush(self) -> None:
+        """Ждёт, пока фоновая задача запишет все поставленные в очередь команды."""
+        if self._queue is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Дописывает очередь (не дольше timeout секунд) и останавливает фоновую задачу."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Cache write queue stopped with {self.depth} pending writes"
+            )
+        self._worker.cancel()
+        self._worker = None
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            self._worker is None
+            or self._worker.done()
+            or self._worker.get_loop() is not loop
+        ):
+            self._queue = asyncio.Queue(self.max_size)
+            self._worker = loop.create_task(self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch: List[CacheWrite] = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for write in batch:
+                        write(pipe)
+                    await pipe.execute()
+                self.written += len(batch)
+            except RedisError as e:
+                self.failed += len(batch)
+                logger.warning(f"Cache write batch of {len(batch)} failed: {e}")
+            except Exception:
+                # Ошибка в самой команде записи не должна останавливать задачу: с ней
+                # пропала бы и вся оставшаяся очередь.
+                self.failed += len(batch)
+                logger.exception(f"Cache write batch of {len(batch)} failed")
+            finally:
+                for _ in batch:
+                    queue.task_done()
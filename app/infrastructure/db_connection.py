@@ -1,17 +1,72 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    async_sessionmaker,
+    AsyncSession,
+    AsyncEngine,
+)
 
 from app.core.config import settings
+from app.infrastructure.db_pool import TimedQueuePool
+from app.infrastructure.metrics import instrument_engine
 
-DATABASE_URL = f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 
-engine = create_async_engine(DATABASE_URL)
+def _database_url(host: str, port: int) -> str:
+    return (
+        f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{host}:{port}/{settings.POSTGRES_DB}"
+        f"?prepared_statement_cache_size={settings.DB_STATEMENT_CACHE_SIZE}"
+    )
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+DATABASE_URL = _database_url(settings.POSTGRES_HOST, settings.POSTGRES_PORT)
+
+engine = _create_engine(DATABASE_URL, "primary")
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+# Без реплики чтение идёт через основной движок.
+read_engine = (
+    _create_engine(
+        _database_url(
+            settings.POSTGRES_READ_HOST,
+            settings.POSTGRES_READ_PORT or settings.POSTGRES_PORT,
+        ),
+        "replica",
+    )
+    if settings.POSTGRES_READ_HOST
+    else engine
+)
+
+read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Определяем зависимость для получения асинхронной сессии, которая используется в приложении."""
     async with async_session_maker() as session:
         yield session
+
+
+async def get_read_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Зависимость для получения сессии только для чтения: на реплике, если она настроена."""
+    async with read_session_maker() as session:
+        yield session
+
+
+def get_pool_stats() -> dict:
+    """Возвращает заполненность пула соединений и статистику ожидания соединений."""
+    return engine.sync_engine.pool.stats()
@@ -0,0 +1,75 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from app.core import settings
+from app.core.logging import logger
+
+# Ключ record.info, под которым _create_connection передаёт в _do_get время открытия соединения.
+CONNECT_SECONDS = "connect_seconds"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который учитывает время ожидания соединения и таймауты.
+
+    Счётчики накопительные; долгие ожидания логируются вместе с заполненностью пула,
+    чтобы размер пула можно было подобрать по реальной нагрузке.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"DB pool checkout timed out: {self.status()}")
+            self._record_wait(time.perf_counter() - started)
+            raise
+        # Открытие нового соединения — не ожидание в очереди пула: иначе волна
+        # переподключений выглядела бы как нехватка соединений.
+        connect = record.info.pop(CONNECT_SECONDS, 0.0)
+        self._record_wait(time.perf_counter() - started - connect)
+        return record
+
+    def _create_connection(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        record = super()._create_connection()
+        record.info[CONNECT_SECONDS] = time.perf_counter() - started
+        return record
+
+    def _record_wait(self, wait: float) -> None:
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        slow_checkout = settings.DB_POOL_SLOW_CHECKOUT
+        if slow_checkout > 0 and wait >= slow_checkout:
+            logger.warning(
+                f"DB pool checkout waited {wait:.3f}s, saturation {self.saturation():.0%}"
+            )
+
+    def saturation(self) -> float:
+        """Доля занятых соединений от максимума пула с учётом overflow; 0 для пула без ограничения (max_overflow=-1)."""
+        if self._max_overflow < 0:
+            return 0.0
+        capacity = self.size() + self._max_overflow
+        return self.checkedout() / capacity if capacity else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "saturation": self.saturation(),
+            "checkouts": self.checkouts,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+            "timeouts": self.timeouts,
+        }
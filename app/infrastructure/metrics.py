@@ -0,0 +1,144 @@
+import time
+from typing import Callable, Collection, Iterator
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.infrastructure.sql_stats import record_query
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по маршруту, методу и коду ответа.",
+    ["method", "route", "status"],
+)
+
+CACHE_OPERATIONS = Counter(
+    "cache_operations_total",
+    "Операции с кэшем: чтения с попаданием, промахом или ошибкой Redis, записи и удаления.",
+    ["cache", "operation", "result"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения SQL-запросов по движку.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Число SQL-запросов на HTTP-запрос по маршруту.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+
+POOL_COUNTERS = ("checkouts", "wait_total", "timeouts")
+
+_stats_collectors: list[Collector] = []
+
+
+class CacheMetrics:
+    """Счётчики операций одного кэша с заранее привязанными метками, чтобы не искать их на каждом вызове."""
+
+    def __init__(self, cache: str):
+        self.hits = CACHE_OPERATIONS.labels(cache, "get", "hit")
+        self.misses = CACHE_OPERATIONS.labels(cache, "get", "miss")
+        self.errors = CACHE_OPERATIONS.labels(cache, "get", "error")
+        self.sets = CACHE_OPERATIONS.labels(cache, "set", "ok")
+        self.deletes = CACHE_OPERATIONS.labels(cache, "delete", "ok")
+
+
+class StatsCollector(Collector):
+    """Отдаёт словарь stats() компонента (пула, очереди) как метрики в момент запроса /metrics.
+
+    Ключи из counters экспортируются как счётчики, остальные — как gauge.
+    """
+
+    def __init__(
+        self, prefix: str, stats: Callable[[], dict], counters: Collection[str] = ()
+    ):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = counters
+
+    def collect(self) -> Iterator[Metric]:
+        for key, value in self.stats().items():
+            name = f"{self.prefix}_{key}"
+            if key in self.counters:
+                yield CounterMetricFamily(name, f"{self.prefix} {key}", value=value)
+            else:
+                yield GaugeMetricFamily(name, f"{self.prefix} {key}", value=value)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Подписывается на события движка: учитывает число и длительность SQL-запросов
+    в метриках и в статистике текущего HTTP-запроса."""
+    histogram = DB_QUERY_DURATION.labels(name)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        duration = time.perf_counter() - context._query_started
+        histogram.observe(duration)
+        record_query(statement, duration)
+
+
+def setup_metrics() -> None:
+    """Регистрирует сборщики статистики пулов и очередей в REGISTRY.
+
+    Повторный вызов ничего не делает: prometheus_client не допускает двух сборщиков
+    с одинаковыми именами метрик.
+    """
+    if _stats_collectors:
+        return
+    # Модули компонентов сами импортируют этот модуль, поэтому импорт отложен до вызова.
+    from app.core.logging import queue_handler
+    from app.infrastructure.db_connection import engine, get_pool_stats, read_engine
+    from app.infrastructure.password_hashing import password_hash_pool
+    from app.infrastructure.redis_cache import cache_write_queue
+
+    _stats_collectors.append(StatsCollector("db_pool", get_pool_stats, POOL_COUNTERS))
+    if read_engine is not engine:
+        _stats_collectors.append(
+            StatsCollector(
+                "db_read_pool",
+                lambda: read_engine.sync_engine.pool.stats(),
+                POOL_COUNTERS,
+            )
+        )
+    _stats_collectors.append(
+        StatsCollector(
+            "cache_write_queue",
+            cache_write_queue.stats,
+            ("written", "dropped", "failed"),
+        )
+    )
+    _stats_collectors.append(
+        StatsCollector(
+            "password_hash_pool",
+            lambda: {
+                "pending": password_hash_pool.pending,
+                "rejected": password_hash_pool.rejected,
+            },
+            ("rejected",),
+        )
+    )
+    _stats_collectors.append(
+        StatsCollector(
+            "log_queue",
+            lambda: {
+                "depth": queue_handler.queue.qsize(),
+                "dropped": queue_handler.dropped,
+            },
+            ("dropped",),
+        )
+    )
+    for collector in _stats_collectors:
+        REGISTRY.register(collector)
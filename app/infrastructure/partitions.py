@@ -0,0 +1,71 @@
+from datetime import date, datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Секция по умолчанию принимает заказы, для месяца которых секция ещё не создана.
+ORDERS_DEFAULT_PARTITION = "orders_default"
+# Откладываемый внешний ключ продуктов на (id, created_at) заказа.
+PRODUCTS_ORDER_FKEY = "products_order_id_order_created_at_fkey"
+
+
+def add_months(month: date, months: int) -> date:
+    """Возвращает первое число месяца, отстоящего от month на months месяцев."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def order_partition_name(month: date) -> str:
+    return f"orders_{month:%Y_%m}"
+
+
+async def create_order_partition(conn: AsyncConnection, month: date) -> bool:
+    """Создаёт секцию orders за месяц month, если её ещё нет; возвращает True, если секция создана.
+
+    Заказы этого месяца, уже попавшие в секцию по умолчанию, переносятся в новую секцию
+    в той же транзакции, иначе PostgreSQL не даст её подключить. Пока новая секция не
+    подключена, перенесённых заказов нет в orders, поэтому внешний ключ продуктов
+    проверяется только при commit.
+    """
+    name = order_partition_name(month)
+    if await conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+        return False
+    bounds = {
+        "start": f"{month.isoformat()} 00:00:00+00",
+        "end": f"{add_months(month, 1).isoformat()} 00:00:00+00",
+    }
+    await conn.execute(
+        text(
+            f"CREATE TABLE {name} (LIKE orders INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    await conn.execute(text(f"SET CONSTRAINTS {PRODUCTS_ORDER_FKEY} DEFERRED"))
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {ORDERS_DEFAULT_PARTITION} "
+            f"WHERE created_at >= CAST(:start AS timestamptz) AND created_at < CAST(:end AS timestamptz) "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    await conn.execute(
+        text(
+            f"ALTER TABLE orders ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+    return True
+
+
+async def create_order_partitions(
+    conn: AsyncConnection, months_ahead: int, start: Optional[date] = None
+) -> List[str]:
+    """Создаёт недостающие месячные секции orders с месяца start (по умолчанию текущего по UTC) на months_ahead месяцев вперёд."""
+    first = (start or datetime.now(timezone.utc).date()).replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        if await create_order_partition(conn, month):
+            created.append(order_partition_name(month))
+    return created
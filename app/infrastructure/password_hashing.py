@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from fastapi_users.password import PasswordHelper, PasswordHelperProtocol
+
+from app.core import settings
+
+T = TypeVar("T")
+
+
+class PasswordHashPoolFull(Exception):
+    """Очередь хэширования паролей заполнена: запрос нужно повторить позже."""
+
+
+class PasswordHashPool:
+    """Выполняет хэширование и проверку паролей в пуле потоков, не блокируя цикл событий.
+
+    Argon2 и bcrypt отпускают GIL, поэтому потоки считают хэши параллельно. Число
+    ожидающих операций ограничено queue_size: сверх него запросы отклоняются сразу,
+    а не копятся в памяти.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_size: int,
+        helper: Optional[PasswordHelperProtocol] = None,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.helper = helper or PasswordHelper()
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.helper.hash, password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(
+            self.helper.verify_and_update, plain_password, hashed_password
+        )
+
+    def shutdown(self) -> None:
+        """Останавливает потоки пула; новый пул создастся при следующем вызове."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self.pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise PasswordHashPoolFull()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="password-hash"
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+        finally:
+            self.pending -= 1
+
+
+password_hash_pool = PasswordHashPool(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE
+)
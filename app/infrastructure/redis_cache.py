@@ -1,13 +1,62 @@
+import asyncio
+import functools
+import hashlib
 import json
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
 
 from app.core import settings
+from app.core.logging import logger
+from app.infrastructure.cache_writer import CacheWrite, CacheWriteQueue
+from app.infrastructure.local_cache import LocalCache
+from app.infrastructure.metrics import CacheMetrics
+from app.infrastructure.serializers import get_serializer, encode_entry, decode_entry
 
 REDIS_URL = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
-redis_client: Redis = Redis.from_url(REDIS_URL, decode_responses=True)
+redis_client: Redis = Redis.from_url(REDIS_URL)
 
 CACHE_TTL = 300
+# Кодек новых записей; прочитать можно запись любым установленным кодеком текущей версии схемы.
+cache_serializer = get_serializer(settings.ORDER_CACHE_SERIALIZER)
+
+# Заполнение кэша выполняется фоновой задачей, чтобы медленный Redis не задерживал ответы;
+# инвалидация при изменении заказов остаётся синхронной.
+cache_write_queue = CacheWriteQueue(
+    redis_client, settings.CACHE_WRITE_QUEUE_SIZE, settings.CACHE_WRITE_BATCH_SIZE
+)
+
+# Локальный кэш воркера перед Redis. Остальные воркеры узнают об изменении заказа
+# из канала INVALIDATION_CHANNEL; свои сообщения воркер отличает по INSTANCE_ID.
+order_l1_cache = LocalCache(settings.ORDER_L1_CACHE_SIZE, settings.ORDER_L1_CACHE_TTL)
+INVALIDATION_CHANNEL = "orders:invalidate"
+INSTANCE_ID = uuid.uuid4().hex
+LISTENER_RETRY_DELAY = 1.0
+
+# Пользователи для аутентификации; локальный кэш других воркеров устаревает не дольше своего TTL.
+user_l1_cache = LocalCache(
+    settings.AUTH_USER_L1_CACHE_SIZE, settings.AUTH_USER_L1_CACHE_TTL
+)
+
+# Списки заказов кэшируются вместе с версией области видимости (пользователь или
+# администратор); любая запись в заказы пользователя увеличивает обе версии.
+ADMIN_LIST_SCOPE = "admin"
+
+order_cache_metrics = CacheMetrics("order")
+list_cache_metrics = CacheMetrics("order_list")
+user_cache_metrics = CacheMetrics("user")
+
+LOCK_POLL_INTERVAL = 0.05
+# Снимает блокировку, только если она всё ещё принадлежит владельцу токена.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
 
 def _get_order_key(order_id: int):
@@ -15,23 +64,387 @@ def _get_order_key(order_id: int):
     return f"order:{order_id}"
 
 
+def _get_user_key(user_id: int):
+    return f"user:{user_id}"
+
+
+def _get_primary_pin_key(user_id: int):
+    return f"db:primary:{user_id}"
+
+
+def _get_order_lock_key(order_id: int):
+    return f"lock:order:{order_id}"
+
+
+def _get_list_version_key(scope: str):
+    return f"orders:list:version:{scope}"
+
+
+def _get_list_key(scope: str, params: dict):
+    """Формирует ключ кэша списка заказов по области видимости и нормализованным параметрам запроса."""
+    raw = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return f"orders:list:{scope}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def get_list_scope(user_id: Optional[int]) -> str:
+    """Возвращает область видимости списка: заказы пользователя или все заказы для администратора."""
+    return f"user:{user_id}" if user_id else ADMIN_LIST_SCOPE
+
+
+def _invalidation_message(order_id: int) -> str:
+    return f"{INSTANCE_ID}:{order_id}"
+
+
+def _fail_open(on_error: Callable[[], Any], metrics: Optional[CacheMetrics] = None):
+    """Декоратор чтения из кэша: при недоступности Redis чтение считается промахом, а не ошибкой запроса."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except RedisError as e:
+                logger.warning(f"Cache read {func.__name__} failed: {e}")
+                if metrics:
+                    metrics.errors.inc()
+                return on_error()
+
+        return wrapper
+
+    return decorator
+
+
+def _pipe_set_orders(pipe: Pipeline, values: Dict[int, bytes], ttl: int) -> None:
+    for order_id, value in values.items():
+        pipe.set(_get_order_key(order_id), value, ex=ttl)
+        if order_l1_cache.enabled:
+            pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(order_id))
+
+
+def _pipe_delete_orders(pipe: Pipeline, order_ids: Iterable[int]) -> None:
+    for order_id in order_ids:
+        pipe.delete(_get_order_key(order_id))
+        if order_l1_cache.enabled:
+            pipe.publish(INVALIDATION_CHANNEL, _invalidation_message(order_id))
+
+
+def _pipe_bump_list_versions(pipe: Pipeline, user_id: int) -> None:
+    pipe.incr(_get_list_version_key(get_list_scope(user_id)))
+    pipe.incr(_get_list_version_key(ADMIN_LIST_SCOPE))
+
+
+def _encode_orders(orders_data: Dict[int, dict]) -> Dict[int, bytes]:
+    """Кодирует записи заказов и кладёт исходные данные в локальный кэш."""
+    values = {}
+    for order_id, data in orders_data.items():
+        values[order_id] = encode_entry(cache_serializer, data)
+        order_l1_cache.set(order_id, data)
+    order_cache_metrics.sets.inc(len(values))
+    return values
+
+
+async def _delete_after_queued_writes(write: CacheWrite) -> None:
+    """Повторяет удаление через очередь фоновой записи, чтобы оно выполнилось после уже
+    поставленных в неё заполнений кэша: иначе запись, поставленная до изменения, вернула бы
+    в кэш устаревшие данные.
+
+    Если очередь переполнена, ждёт записи поставленного не дольше CACHE_WRITE_FLUSH_TIMEOUT
+    секунд и удаляет сразу: при медленном Redis запрос не ждёт разбора всей очереди.
+    """
+    if cache_write_queue.put(write):
+        return
+    try:
+        await asyncio.wait_for(
+            cache_write_queue.flush(), settings.CACHE_WRITE_FLUSH_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Cache write queue not flushed in {settings.CACHE_WRITE_FLUSH_TIMEOUT}s, "
+            "deleting directly"
+        )
+    async with redis_client.pipeline(transaction=False) as pipe:
+        write(pipe)
+        await pipe.execute()
+
+
 async def set_order_cache(order_id: int, data: dict, ttl: int = CACHE_TTL):
     """Асинхронная функция для установки кэшированных данных заказа в Redis с заданным TTL."""
-    key = _get_order_key(order_id)
-    result = await redis_client.set(key, json.dumps(data), ex=ttl)
-    return result
+    return await set_orders_cache({order_id: data}, ttl)
+
+
+async def set_orders_cache(orders_data: Dict[int, dict], ttl: int = CACHE_TTL):
+    """Асинхронная функция для установки кэша нескольких заказов одним пайплайном Redis."""
+    values = _encode_orders(orders_data)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        _pipe_set_orders(pipe, values, ttl)
+        return await pipe.execute()
+
+
+def schedule_orders_cache(orders_data: Dict[int, dict], ttl: int = CACHE_TTL) -> bool:
+    """Ставит запись кэша заказов в фоновую очередь, не дожидаясь Redis; False, если очередь переполнена."""
+    values = _encode_orders(orders_data)
+    return cache_write_queue.put(lambda pipe: _pipe_set_orders(pipe, values, ttl))
 
 
-async def get_order_cache(order_id: int):
-    """Асинхронная функция для получения кэшированных данных заказа из Redis."""
+def schedule_order_cache(order_id: int, data: dict, ttl: int = CACHE_TTL) -> bool:
+    """Ставит запись кэша заказа в фоновую очередь, не дожидаясь Redis."""
+    return schedule_orders_cache({order_id: data}, ttl)
+
+
+@_fail_open(lambda: None, order_cache_metrics)
+async def get_order_cache(order_id: int) -> Optional[dict]:
+    """Асинхронная функция для получения кэшированных данных заказа: сначала из локального кэша, затем из Redis."""
+    data = order_l1_cache.get(order_id)
+    if data:
+        order_cache_metrics.hits.inc()
+        return data
     key = _get_order_key(order_id)
-    value = await redis_client.get(key)
-    if value:
-        return value
+    data = decode_entry(await redis_client.get(key))
+    if data:
+        order_cache_metrics.hits.inc()
+        order_l1_cache.set(order_id, data)
+        return data
+    order_cache_metrics.misses.inc()
+    return None
+
+
+@_fail_open(dict, order_cache_metrics)
+async def get_orders_cache(order_ids: List[int]) -> Dict[int, dict]:
+    """Асинхронная функция для получения кэша нескольких заказов: локальный кэш, затем один MGET в Redis."""
+    found = {}
+    missing = []
+    for order_id in order_ids:
+        data = order_l1_cache.get(order_id)
+        if data:
+            found[order_id] = data
+        else:
+            missing.append(order_id)
+    if missing:
+        values = await redis_client.mget([_get_order_key(i) for i in missing])
+        for order_id, value in zip(missing, values):
+            data = decode_entry(value)
+            if data:
+                order_l1_cache.set(order_id, data)
+                found[order_id] = data
+    order_cache_metrics.hits.inc(len(found))
+    order_cache_metrics.misses.inc(len(order_ids) - len(found))
+    return found
+
+
+@_fail_open(lambda: (None, None), order_cache_metrics)
+async def get_order_cache_with_ttl(
+    order_id: int,
+) -> Tuple[Optional[dict], Optional[float]]:
+    """Асинхронная функция для получения кэша заказа вместе с оставшимся временем жизни записи в секундах.
+
+    Для записей из локального кэша время жизни не возвращается.
+    """
+    data = order_l1_cache.get(order_id)
+    if data:
+        order_cache_metrics.hits.inc()
+        return data, None
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.get(_get_order_key(order_id))
+        pipe.pttl(_get_order_key(order_id))
+        value, pttl = await pipe.execute()
+    data = decode_entry(value)
+    if not data:
+        order_cache_metrics.misses.inc()
+        return None, None
+    order_cache_metrics.hits.inc()
+    order_l1_cache.set(order_id, data)
+    return data, pttl / 1000 if pttl > 0 else None
+
+
+async def acquire_order_lock(order_id: int, timeout: float) -> Optional[str]:
+    """Пытается взять межпроцессную блокировку загрузки заказа; возвращает токен владельца или None."""
+    token = uuid.uuid4().hex
+    acquired = await redis_client.set(
+        _get_order_lock_key(order_id), token, nx=True, px=int(timeout * 1000)
+    )
+    return token if acquired else None
+
+
+async def release_order_lock(order_id: int, token: str) -> None:
+    """Снимает блокировку загрузки заказа, если она принадлежит владельцу токена."""
+    await redis_client.eval(
+        RELEASE_LOCK_SCRIPT, 1, _get_order_lock_key(order_id), token
+    )
+
+
+async def wait_for_order_cache(order_id: int, timeout: float) -> Optional[dict]:
+    """Ждёт, пока другой процесс заполнит кэш заказа, не дольше timeout секунд."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        data = await get_order_cache(order_id)
+        if data:
+            return data
     return None
 
 
 async def delete_order_cache(order_id: int):
-    """Асинхронная функция для удаления кэшированных данных заказа из Redis."""
-    key = _get_order_key(order_id)
-    await redis_client.delete(key)
+    """Асинхронная функция для удаления кэшированных данных заказа из Redis и локальных кэшей всех воркеров."""
+    order_l1_cache.delete(order_id)
+    order_cache_metrics.deletes.inc()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        _pipe_delete_orders(pipe, [order_id])
+        await pipe.execute()
+    await _delete_after_queued_writes(
+        lambda pipe: _pipe_delete_orders(pipe, [order_id])
+    )
+
+
+async def invalidate_orders_cache(
+    user_id: int,
+    order_ids: Iterable[int] = (),
+    pin_seconds: float = 0,
+    writer_id: Optional[int] = None,
+):
+    """Асинхронная функция для инвалидации при изменении заказов пользователя user_id: удаляет их
+    из кэша, сбрасывает кэшированные списки пользователя и администратора и, если pin_seconds > 0,
+    закрепляет за основной БД автора изменения writer_id (по умолчанию владельца) — всё одним пайплайном. Удаление заказов повторяется через
+    очередь фоновой записи после ранее поставленных заполнений."""
+    order_ids = list(order_ids)
+    for order_id in order_ids:
+        order_l1_cache.delete(order_id)
+    order_cache_metrics.deletes.inc(len(order_ids))
+    list_cache_metrics.deletes.inc()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        _pipe_delete_orders(pipe, order_ids)
+        _pipe_bump_list_versions(pipe, user_id)
+        if pin_seconds > 0:
+            pipe.set(
+                _get_primary_pin_key(writer_id or user_id),
+                1,
+                px=int(pin_seconds * 1000),
+            )
+        result = await pipe.execute()
+    if order_ids:
+        await _delete_after_queued_writes(
+            lambda pipe: _pipe_delete_orders(pipe, order_ids)
+        )
+    return result
+
+
+@_fail_open(lambda: True)
+async def is_pinned_to_primary(user_id: int) -> bool:
+    """Проверяет, писал ли пользователь недавно, и его чтения нужно направить в основную БД.
+
+    Если Redis недоступен, чтение идёт в основную БД."""
+    return bool(await redis_client.exists(_get_primary_pin_key(user_id)))
+
+
+@_fail_open(lambda: (None, None), list_cache_metrics)
+async def get_orders_list_cache(
+    scope: str, params: dict
+) -> Tuple[Optional[dict], Optional[int]]:
+    """Асинхронная функция для получения кэша страницы списка заказов за один запрос к Redis.
+
+    Возвращает страницу (или None, если записи нет или она построена до последнего изменения)
+    и текущую версию области видимости, с которой нужно сохранить новую страницу
+    (None, если Redis недоступен).
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.get(_get_list_version_key(scope))
+        pipe.get(_get_list_key(scope, params))
+        version, value = await pipe.execute()
+    version = int(version or 0)
+    entry = decode_entry(value)
+    if entry and entry["version"] == version:
+        list_cache_metrics.hits.inc()
+        return entry["page"], version
+    list_cache_metrics.misses.inc()
+    return None, version
+
+
+def schedule_orders_list_cache(
+    scope: str, params: dict, version: int, page: dict, ttl: int
+) -> bool:
+    """Ставит в фоновую очередь сохранение страницы списка заказов с версией, на которой она построена."""
+    key = _get_list_key(scope, params)
+    value = encode_entry(cache_serializer, {"version": version, "page": page})
+    list_cache_metrics.sets.inc()
+    return cache_write_queue.put(lambda pipe: pipe.set(key, value, ex=ttl))
+
+
+async def bump_orders_list_version(user_id: int):
+    """Асинхронная функция для инвалидации кэшированных списков пользователя и администратора."""
+    list_cache_metrics.deletes.inc()
+    async with redis_client.pipeline(transaction=False) as pipe:
+        _pipe_bump_list_versions(pipe, user_id)
+        return await pipe.execute()
+
+
+@_fail_open(lambda: None, user_cache_metrics)
+async def get_user_cache(user_id: int) -> Optional[dict]:
+    """Асинхронная функция для получения кэшированных данных пользователя из локального кэша или Redis."""
+    data = user_l1_cache.get(user_id)
+    if data is not None:
+        user_cache_metrics.hits.inc()
+        return data
+    data = decode_entry(await redis_client.get(_get_user_key(user_id)))
+    if data is None:
+        user_cache_metrics.misses.inc()
+        return None
+    user_cache_metrics.hits.inc()
+    user_l1_cache.set(user_id, data)
+    return data
+
+
+def schedule_user_cache(user_id: int, data: dict, ttl: int) -> bool:
+    """Ставит запись кэша пользователя в фоновую очередь."""
+    key = _get_user_key(user_id)
+    value = encode_entry(cache_serializer, data)
+    user_l1_cache.set(user_id, data)
+    user_cache_metrics.sets.inc()
+    return cache_write_queue.put(lambda pipe: pipe.set(key, value, ex=ttl))
+
+
+async def delete_user_cache(user_id: int):
+    """Асинхронная функция для удаления кэшированных данных пользователя после его изменения."""
+    user_l1_cache.delete(user_id)
+    user_cache_metrics.deletes.inc()
+    key = _get_user_key(user_id)
+    result = await redis_client.delete(key)
+    # Запись пользователя, поставленная в очередь до изменения, не должна вернуть его прежнее состояние.
+    await _delete_after_queued_writes(lambda pipe: pipe.delete(key))
+    return result
+
+
+def handle_invalidation_message(message: bytes) -> None:
+    """Удаляет заказ из локального кэша по сообщению другого воркера."""
+    sender, _, order_id = message.decode().partition(":")
+    if sender != INSTANCE_ID and order_id.isdigit():
+        order_l1_cache.delete(int(order_id))
+
+
+async def listen_order_invalidations() -> None:
+    """Слушает канал инвалидации и вытесняет изменённые заказы из локального кэша.
+
+    Пока подписка разорвана, сообщения теряются, поэтому после переподключения
+    локальный кэш очищается целиком.
+    """
+    while True:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            order_l1_cache.clear()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    handle_invalidation_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except RedisError as e:
+            logger.warning(f"Order invalidation listener disconnected: {e}")
+            order_l1_cache.clear()
+            await asyncio.sleep(LISTENER_RETRY_DELAY)
+        finally:
+            await pubsub.aclose()
+
+
+def start_invalidation_listener() -> Optional[asyncio.Task]:
+    """Запускает слушатель инвалидации, если локальный кэш включён."""
+    if not order_l1_cache.enabled:
+        return None
+    return asyncio.create_task(listen_order_invalidations())
@@ -0,0 +1,109 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type
+
+# Версия схемы данных в кэше. Увеличивается при любом изменении формата
+# map_order_to_cache_data: записи старых версий считаются промахом кэша.
+CACHE_SCHEMA_VERSION = 1
+
+
+class CacheSerializer(ABC):
+    """Кодек записей кэша; codec — байт, по которому запись декодируется независимо от текущих настроек."""
+
+    codec: int
+
+    @abstractmethod
+    def dumps(self, data: Any) -> bytes:
+        """Кодирует данные записи в байты."""
+
+    @abstractmethod
+    def loads(self, raw: bytes) -> Any:
+        """Декодирует байты, полученные из dumps."""
+
+
+class JsonSerializer(CacheSerializer):
+    codec = 1
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+
+class OrjsonSerializer(CacheSerializer):
+    codec = 2
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, data: Any) -> bytes:
+        return self._orjson.dumps(data)
+
+    def loads(self, raw: bytes) -> Any:
+        return self._orjson.loads(raw)
+
+
+class MsgpackSerializer(CacheSerializer):
+    codec = 3
+
+    def __init__(self):
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def dumps(self, data: Any) -> bytes:
+        return self._msgpack.packb(data)
+
+    def loads(self, raw: bytes) -> Any:
+        return self._msgpack.unpackb(raw)
+
+
+SERIALIZERS: Dict[str, Type[CacheSerializer]] = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+_CODECS: Dict[int, Type[CacheSerializer]] = {s.codec: s for s in SERIALIZERS.values()}
+_instances: Dict[Type[CacheSerializer], Optional[CacheSerializer]] = {}
+
+
+def _instance(serializer_class: Type[CacheSerializer]) -> Optional[CacheSerializer]:
+    """Возвращает экземпляр кодека или None, если его библиотека не установлена."""
+    if serializer_class not in _instances:
+        try:
+            _instances[serializer_class] = serializer_class()
+        except ImportError:
+            _instances[serializer_class] = None
+    return _instances[serializer_class]
+
+
+def get_serializer(name: str) -> CacheSerializer:
+    """Возвращает кодек по имени из настроек."""
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown cache serializer: {name}")
+    serializer = _instance(SERIALIZERS[name])
+    if serializer is None:
+        raise ValueError(f"Cache serializer {name} requires the {name} package")
+    return serializer
+
+
+def encode_entry(serializer: CacheSerializer, data: Any) -> bytes:
+    """Кодирует запись кэша: байт версии схемы, байт кодека, затем данные."""
+    return bytes((CACHE_SCHEMA_VERSION, serializer.codec)) + serializer.dumps(data)
+
+
+def decode_entry(raw: Optional[bytes]) -> Optional[Any]:
+    """Декодирует запись кэша; записи другой версии схемы или неизвестного кодека возвращаются как None."""
+    if not raw or len(raw) < 2 or raw[0] != CACHE_SCHEMA_VERSION:
+        return None
+    serializer_class = _CODECS.get(raw[1])
+    serializer = _instance(serializer_class) if serializer_class else None
+    if serializer is None:
+        return None
+    try:
+        return serializer.loads(raw[2:])
+    except ValueError:
+        return None
@@ -0,0 +1,85 @@
+import re
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from app.core import settings
+from app.core.logging import logger
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):(?!:)\w+|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Приводит запрос к шаблону: литералы и параметры заменяются на ?, списки IN — на (...)."""
+    statement = _STRING.sub("?", statement)
+    statement = _PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("(...)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+class RequestSqlStats:
+    """SQL-запросы одного HTTP-запроса: количество, суммарное время и повторы одинаковых выражений.
+
+    Повторы считаются по тексту выражения: SQLAlchemy кэширует компиляцию, поэтому
+    загрузка в цикле (N+1) даёт один и тот же текст с разными параметрами.
+    """
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Dict[str, int] = {}
+
+    @property
+    def route(self) -> str:
+        """Шаблон маршрута запроса; известен после того, как роутер сопоставил путь."""
+        if self.scope is None:
+            return "-"
+        route = self.scope.get("route")
+        return route.path if route is not None else self.scope["path"]
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Выражения, выполненные не меньше threshold раз, в нормализованном виде."""
+        return [
+            (normalize_sql(statement), count)
+            for statement, count in self.statements.items()
+            if count >= threshold
+        ]
+
+
+current_sql_stats: ContextVar[Optional[RequestSqlStats]] = ContextVar(
+    "current_sql_stats", default=None
+)
+
+
+def record_query(statement: str, duration: float) -> None:
+    """Учитывает выполненный запрос в статистике текущего HTTP-запроса и пишет медленные запросы в лог."""
+    stats = current_sql_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    slow_query = settings.SQL_SLOW_QUERY_SECONDS
+    if slow_query > 0 and duration >= slow_query:
+        route = stats.route if stats is not None else "-"
+        logger.warning(
+            f"Slow query {duration:.3f}s on {route}: {normalize_sql(statement)}"
+        )
+
+
+def report_request_sql(stats: RequestSqlStats) -> None:
+    """Пишет в лог повторяющиеся в одном HTTP-запросе выражения (вероятные N+1)."""
+    threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+    if threshold <= 0:
+        return
+    for statement, count in stats.repeated(threshold):
+        logger.warning(
+            f"Possible N+1 on {stats.route}: {count} executions of {statement}"
+        )
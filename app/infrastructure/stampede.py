@@ -0,0 +1,68 @@
+import asyncio
+import math
+import random
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Объединяет конкурентные загрузки одного ключа в процессе: загружает первый вызов, остальные ждут его результат."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Возвращает результат loader для ключа, вызывая его не более одного раза одновременно."""
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Запрос-загрузчик отменён клиентом: ожидающие грузят данные сами.
+                if not future.cancelled():
+                    raise
+                return await loader()
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Помечаем исключение полученным, даже если ожидающих не было.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+
+class EarlyRefresh:
+    """Вероятностное досрочное обновление записей кэша (XFetch).
+
+    Чем ближе истечение TTL и чем дольше обычно длится загрузка из БД, тем выше
+    вероятность, что очередной запрос обновит запись заранее. Так истечение
+    популярного ключа не приводит к одновременному промаху всех запросов.
+    """
+
+    def __init__(self, beta: float, smoothing: float = 0.2):
+        self.beta = beta
+        self.smoothing = smoothing
+        self.load_time = 0.0
+
+    def record_load_time(self, seconds: float) -> None:
+        """Учитывает длительность загрузки в скользящем среднем."""
+        self.load_time += self.smoothing * (seconds - self.load_time)
+
+    def should_refresh(self, ttl: Optional[float]) -> bool:
+        """Решает, обновлять ли запись с оставшимся временем жизни ttl секунд."""
+        if self.beta <= 0 or not ttl or ttl <= 0:
+            return False
+        return -self.load_time * self.beta * math.log(1.0 - random.random()) >= ttl
@@ -1,9 +1,59 @@
+from contextlib import asynccontextmanager
+
 import fastapi
+from fastapi import status
+from fastapi.responses import JSONResponse
 
+from app.application.services.order_archiver import start_order_archiver
+from app.infrastructure.metrics import setup_metrics
+from app.infrastructure.password_hashing import (
+    password_hash_pool,
+    PasswordHashPoolFull,
+)
+from app.infrastructure.redis_cache import (
+    cache_write_queue,
+    start_invalidation_listener,
+)
+from app.presentation.api.middleware import (
+    MetricsMiddleware,
+    SqlStatsMiddleware,
+    RequestContextMiddleware,
+)
 from app.presentation.api.routers import api_router
 
 
-app = fastapi.FastAPI()
+@asynccontextmanager
+async def lifespan(app: fastapi.FastAPI):
+    """Регистрирует метрики и запускает фоновые задачи воркера на время жизни приложения."""
+    setup_metrics()
+    invalidation_listener = start_invalidation_listener()
+    order_archiver = start_order_archiver()
+    yield
+    if invalidation_listener:
+        invalidation_listener.cancel()
+    if order_archiver:
+        order_archiver.cancel()
+    await cache_write_queue.stop()
+    password_hash_pool.shutdown()
+
+
+app = fastapi.FastAPI(lifespan=lifespan)
+app.add_middleware(SqlStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
+
+
+@app.exception_handler(PasswordHashPoolFull)
+async def password_hash_pool_full_handler(
+    request: fastapi.Request, exc: PasswordHashPoolFull
+):
+    """Отвечает 503, когда очередь хэширования паролей переполнена."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many authentication requests, try again later"},
+        headers={"Retry-After": "1"},
+    )
+
 
 app.include_router(
     api_router,
@@ -1,16 +1,28 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Literal, Optional, AsyncIterator, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from app.application.repositories.order_repo import OrderRepository
-from app.application.services.order_service import OrderService
+from app.application.services.order_service import (
+    OrderService,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
 from app.core.security import current_user
-from app.domain.models import User
-from app.infrastructure.db_connection import get_async_session
+from app.domain.models import User, Order
+from app.core import settings
+from app.infrastructure.db_connection import (
+    get_async_session,
+    get_read_async_session,
+)
+from app.infrastructure.redis_cache import is_pinned_to_primary
 from app.presentation.mappers.order_mapper import (
     map_order_to_dto,
+    map_cache_data_to_dto,
     map_order_create_dto_to_order,
     map_order_update_dto_to_order,
 )
@@ -18,10 +30,18 @@ from app.presentation.schemas.order_dto import (
     OrderCreateDTO,
     OrderResponseDTO,
     OrderUpdateDTO,
+    OrderPageDTO,
+    BulkOrderErrorDTO,
+    BulkOrderResponseDTO,
+    OrderStatusStatsDTO,
 )
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MAX_BULK_ORDERS = 5000
+MAX_BATCH_ORDERS = 200
+
 
 async def get_order_service(
     db: AsyncSession = Depends(get_async_session),
@@ -30,35 +50,193 @@ async def get_order_service(
     return OrderService(repository)
 
 
+async def get_order_read_service(
+    db: AsyncSession = Depends(get_async_session),
+    read_db: AsyncSession = Depends(get_read_async_session),
+    user: User = Depends(current_user),
+) -> OrderService:
+    """Сервис для чтения заказов: читает с реплики, если пользователь недавно ничего не изменял.
+
+    Сессии открывают соединение только при первом запросе, поэтому неиспользованная ничего не стоит.
+    Закреплённый за основной БД пользователь читает и мимо общего кэша: его могли заполнить
+    с реплики, ещё не получившей изменения этого пользователя.
+    """
+    if not settings.POSTGRES_READ_HOST:
+        return OrderService(OrderRepository(db))
+    if await is_pinned_to_primary(user.id):
+        return OrderService(OrderRepository(db), read_cache=False)
+    return OrderService(OrderRepository(read_db))
+
+
+async def _orders_to_ndjson(orders: AsyncIterator[Order]) -> AsyncIterator[str]:
+    """Сериализует поток заказов в NDJSON: по одной заявке на строку."""
+    async for order in orders:
+        yield map_order_to_dto(order).model_dump_json() + "\n"
+
+
 @router.get(
     "/all",
-    response_model=List[OrderResponseDTO,],
+    response_model=OrderPageDTO,
     summary="Эндпоинт возвращает список заявок",
-    description="Обычный пользователь видит только свои заявки, администратор — все заявки.",
+    description="Обычный пользователь видит только свои заявки, администратор — все заявки. Список отдаётся страницами с курсором, "
+    "а при заголовке Accept: application/x-ndjson — потоком всех заявок.",
     status_code=status.HTTP_200_OK,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
 )
 async def get_orders(
+    request: Request,
     status: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    service: OrderService = Depends(get_order_service),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "total_price"] = "id",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    service: OrderService = Depends(get_order_read_service),
     user: User = Depends(current_user),
 ):
     """
-    Получить список заявок с возможностью фильтрации по статусу и цене.
+    Получить страницу заявок с возможностью фильтрации по статусу и цене.
     - **status**: Фильтрация по статусу заявки (например, "pending", "confirmed", "cancelled").
     - **min_price**: Минимальная общая стоимость заявки.
     - **max_price**: Максимальная общая стоимость заявки.
+    - **limit**: Максимальное количество заявок на странице.
+    - **cursor**: Курсор из поля next_cursor предыдущей страницы.
+    - **order_by**: Поле сортировки: "id" или "total_price".
+    - **created_from**: Заявки, созданные не раньше этого момента (ISO 8601).
+    - **created_to**: Заявки, созданные раньше этого момента (ISO 8601), граница не включается.
     - **user**: Текущий авторизованный пользователь.
     Если пользователь не является администратором, возвращаются только его заявки.
+    Если next_cursor равен null, страница последняя.
+    При Accept: application/x-ndjson заявки передаются построчно по мере чтения из БД, limit и cursor игнорируются.
     """
     user_id = user.id if not user.is_superuser else None
 
-    orders = await service.get_orders(
-        status=status, min_price=min_price, max_price=max_price, user_id=user_id
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        try:
+            orders = service.stream_orders(
+                status=status,
+                min_price=min_price,
+                max_price=max_price,
+                user_id=user_id,
+                order_by=order_by,
+                created_from=created_from,
+                created_to=created_to,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            _orders_to_ndjson(orders), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    try:
+        orders, next_cursor = await service.get_orders(
+            status=status,
+            min_price=min_price,
+            max_price=max_price,
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            order_by=order_by,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return OrderPageDTO(
+        items=[map_cache_data_to_dto(order_data) for order_data in orders],
+        next_cursor=next_cursor,
     )
 
-    return [map_order_to_dto(order) for order in orders]
+
+@router.get(
+    "/batch",
+    response_model=List[OrderResponseDTO],
+    summary="Эндпоинт возвращает несколько заявок по списку id",
+    description="Возвращает заявки по списку идентификаторов за один запрос. Ненайденные и чужие заявки пропускаются.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_orders_batch(
+    ids: List[int] = Query(...),
+    service: OrderService = Depends(get_order_read_service),
+    user: User = Depends(current_user),
+):
+    """
+    Получить несколько заявок по их идентификаторам.
+    - **ids**: Идентификаторы заявок, например ?ids=1&ids=2 (не более 200).
+    - **user**: Текущий авторизованный пользователь.
+    Заявки возвращаются в порядке запроса. Если заявка не найдена или пользователь
+    не является ее владельцем или администратором, она не попадает в ответ.
+    """
+    order_ids = list(dict.fromkeys(ids))
+    if len(order_ids) > MAX_BATCH_ORDERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids, max {MAX_BATCH_ORDERS}",
+        )
+
+    orders_data = await service.get_orders_data(order_ids)
+    return [
+        map_cache_data_to_dto(orders_data[order_id])
+        for order_id in order_ids
+        if order_id in orders_data
+        and (user.is_superuser or orders_data[order_id]["user_id"] == user.id)
+    ]
+
+
+@router.get(
+    "/stats",
+    response_model=List[OrderStatusStatsDTO],
+    summary="Эндпоинт возвращает статистику заявок по статусам",
+    description="Число заявок и их общая стоимость по каждому статусу. Обычный пользователь видит статистику своих заявок, "
+    "администратор — всех заявок.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_orders_stats(
+    service: OrderService = Depends(get_order_read_service),
+    user: User = Depends(current_user),
+):
+    """
+    Получить число и выручку заявок по статусам.
+    - **user**: Текущий авторизованный пользователь.
+    Удалённые заявки не учитываются. Данные берутся из сводной таблицы, а не считаются по заявкам.
+    """
+    user_id = user.id if not user.is_superuser else None
+    stats = await service.get_stats(user_id)
+    return [
+        OrderStatusStatsDTO(status=order_status.value, count=count, revenue=revenue)
+        for order_status, (count, revenue) in stats.items()
+    ]
+
+
+@router.get(
+    "/archive/{order_id}",
+    response_model=OrderResponseDTO,
+    summary="Эндпоинт возвращает заявку из архива по id",
+    description="Возвращает удалённую заявку, уже перенесённую в архив. Доступно только администратору.",
+    status_code=status.HTTP_200_OK,
+)
+async def get_archived_order(
+    order_id: int,
+    service: OrderService = Depends(get_order_read_service),
+    user: User = Depends(current_user),
+):
+    """
+    Получить заявку из архива удалённых заявок по ее идентификатору.
+    - **order_id**: Идентификатор заявки.
+    - **user**: Текущий авторизованный пользователь.
+    Если пользователь не является администратором, возвращается ошибка 403.
+    Если заявки нет в архиве, возвращается ошибка 404.
+    """
+    if not user.is_superuser:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    order = await service.get_archived_order(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return map_order_to_dto(order)
 
 
 @router.get(
@@ -70,7 +248,7 @@ async def get_orders(
 )
 async def get_order(
     order_id: int,
-    service: OrderService = Depends(get_order_service),
+    service: OrderService = Depends(get_order_read_service),
     user: User = Depends(current_user),
 ):
     """
@@ -80,14 +258,14 @@ async def get_order(
     Если заявка не найдена, возвращается ошибка 404.
     Если пользователь не является администратором и не является владельцем заявки, возвращается ошибка 403.
     """
-    order = await service.get_order_by_id(order_id=order_id)
-    if not order:
+    order_data = await service.get_order_data(order_id=order_id)
+    if not order_data:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    if not user.is_superuser and order.user_id != user.id:
+    if not user.is_superuser and order_data["user_id"] != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    return map_order_to_dto(order)
+    return map_cache_data_to_dto(order_data)
 
 
 @router.post(
@@ -117,6 +295,48 @@ async def create_order(
     return map_order_to_dto(created_order)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkOrderResponseDTO,
+    summary="Эндпоинт для пакетного создания заявок",
+    description="Создание нескольких заявок за один запрос одной транзакцией. Ошибки возвращаются по каждой заявке отдельно.",
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_orders_bulk(
+    orders_dto: List[OrderCreateDTO],
+    service: OrderService = Depends(get_order_service),
+    user: User = Depends(current_user),
+):
+    """
+    Создать несколько заявок.
+    - **orders_dto**: Список данных для создания заявок.
+    - **user**: Текущий авторизованный пользователь.
+    Все созданные заявки привязываются к текущему пользователю.
+    Заявки с некорректными данными не создаются и попадают в errors с индексом в исходном списке.
+    """
+    if len(orders_dto) > MAX_BULK_ORDERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many orders, max {MAX_BULK_ORDERS}",
+        )
+
+    orders, errors = [], []
+    for index, order_dto in enumerate(orders_dto):
+        try:
+            order = map_order_create_dto_to_order(order_dto)
+        except ValueError as e:
+            errors.append(BulkOrderErrorDTO(index=index, detail=str(e)))
+            continue
+        order.user_id = user.id
+        orders.append(order)
+
+    created_orders = await service.create_orders(orders)
+    return BulkOrderResponseDTO(
+        created=[map_order_to_dto(order) for order in created_orders],
+        errors=errors,
+    )
+
+
 @router.put(
     "/update/{order_id}",
     response_model=OrderResponseDTO,
@@ -150,7 +370,9 @@ async def update_order(
         order = map_order_update_dto_to_order(order, order_dto)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    updated_order = await service.update_order(order)
+    updated_order = await service.update_order(order, writer_id=user.id)
+    if not updated_order:
+        raise HTTPException(status_code=404, detail="Order not found")
 
     return map_order_to_dto(updated_order)
 
@@ -184,4 +406,4 @@ async def delete_order(
     if not user.is_superuser and order.user_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    await service.soft_delete_order(order)
+    await service.soft_delete_order(order, writer_id=user.id)
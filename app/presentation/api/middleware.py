@@ -0,0 +1,127 @@
+import time
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import settings
+from app.core.logging import request_context
+from app.infrastructure.metrics import HTTP_REQUEST_DURATION, HTTP_REQUEST_DB_QUERIES
+from app.infrastructure.sql_stats import (
+    RequestSqlStats,
+    current_sql_stats,
+    report_request_sql,
+)
+
+# Метка маршрута для запросов, не совпавших ни с одним маршрутом: сырой путь дал бы
+# неограниченное число временных рядов.
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_ID_HEADER = "X-Request-ID"
+MAX_REQUEST_ID_LENGTH = 64
+
+
+class MetricsMiddleware:
+    """ASGI-middleware, которое учитывает время обработки запросов по шаблону маршрута.
+
+    Реализовано без BaseHTTPMiddleware, чтобы не добавлять задачу и копирование тела
+    на каждый запрос; потоковые ответы учитываются до отправки последнего фрагмента.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                status_code,
+            ).observe(time.perf_counter() - started)
+
+
+class SqlStatsMiddleware:
+    """ASGI-middleware, которое собирает SQL-запросы каждого HTTP-запроса.
+
+    Запросы учитываются обработчиками событий движка через contextvar; по завершении
+    запроса в лог пишутся вероятные N+1, а при SERVER_TIMING в ответ добавляется
+    заголовок Server-Timing со временем БД и всего запроса.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSqlStats(scope)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING:
+                total = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                    f"total;dur={total:.1f}",
+                )
+            await send(message)
+
+        token = current_sql_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_sql_stats.reset(token)
+            HTTP_REQUEST_DB_QUERIES.labels(
+                stats.route if scope.get("route") else UNMATCHED_ROUTE
+            ).observe(stats.count)
+            report_request_sql(stats)
+
+
+class RequestContextMiddleware:
+    """ASGI-middleware, которое задаёт идентификатор запроса для логов и возвращает его в X-Request-ID.
+
+    Идентификатор берётся из заголовка X-Request-ID запроса или генерируется.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER, "")[
+            :MAX_REQUEST_ID_LENGTH
+        ]
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        token = request_context.set((request_id, time.perf_counter()))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_context.reset(token)
@@ -3,7 +3,7 @@ from fastapi.security import HTTPBearer
 
 from app.application.users.transport import auth_backend
 from app.core.security import fastapi_users
-from app.presentation.api.endpoints import order
+from app.presentation.api.endpoints import order, metrics
 from app.presentation.schemas.user_dto import UserRead, UserCreate
 
 http_bearer: HTTPBearer = HTTPBearer(auto_error=False)
@@ -12,6 +12,8 @@ api_router = APIRouter(dependencies=[Depends(http_bearer)])
 
 api_router.include_router(order.router, prefix="/orders", tags=["order"])
 
+api_router.include_router(metrics.router, tags=["metrics"])
+
 api_router.include_router(
     fastapi_users.get_auth_router(auth_backend),
     prefix="/auth",
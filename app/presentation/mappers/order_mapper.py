@@ -1,6 +1,6 @@
-import json
+from typing import Union
 
-from app.domain.models import Order, Product
+from app.domain.models import Order, Product, OrderArchive
 from app.domain.models.order import OrderStatus
 from app.presentation.schemas.order_dto import (
     OrderResponseDTO,
@@ -10,8 +10,8 @@ from app.presentation.schemas.order_dto import (
 )
 
 
-def map_order_to_dto(order: Order) -> OrderResponseDTO:
-    """Преобразует объект Order в OrderResponseDTO с вложенными продуктами."""
+def map_order_to_dto(order: Union[Order, OrderArchive]) -> OrderResponseDTO:
+    """Преобразует объект Order (или заказ из архива) в OrderResponseDTO с вложенными продуктами."""
     products = [
         ProductDTO(name=p.name, price=p.price, quantity=p.quantity)
         for p in order.products
@@ -25,6 +25,11 @@ def map_order_to_dto(order: Order) -> OrderResponseDTO:
     )
 
 
+def map_cache_data_to_dto(data: dict) -> OrderResponseDTO:
+    """Преобразует данные заказа из кэша сразу в OrderResponseDTO, минуя ORM-объекты."""
+    return OrderResponseDTO.model_validate(data)
+
+
 def map_order_create_dto_to_order(dto: OrderCreateDTO) -> Order:
     """Преобразует OrderCreateDTO в объект Order, создавая и добавляя вложенные продукты."""
     order = Order(
@@ -38,14 +43,17 @@ def map_order_create_dto_to_order(dto: OrderCreateDTO) -> Order:
 
 
 def map_order_update_dto_to_order(order: Order, dto: OrderUpdateDTO) -> Order:
-    """Обновляет объект Order данными из OrderUpdateDTO, очищая и заменяя список продуктов."""
-    order.customer_name = dto.customer_name
-    order.status = OrderStatus(dto.status)
-    order.products.clear()
-    for prod in dto.products:
-        product = Product(name=prod.name, price=prod.price, quantity=prod.quantity)
-        order.products.append(product)
-    return order
+    """Возвращает новый объект Order с данными из OrderUpdateDTO, не трогая продукты исходного заказа: их сопоставляет репозиторий."""
+    return Order(
+        id=order.id,
+        user_id=order.user_id,
+        customer_name=dto.customer_name,
+        status=OrderStatus(dto.status),
+        products=[
+            Product(name=prod.name, price=prod.price, quantity=prod.quantity)
+            for prod in dto.products
+        ],
+    )
 
 
 def map_order_to_cache_data(order: Order) -> dict:
@@ -63,8 +71,8 @@ def map_order_to_cache_data(order: Order) -> dict:
     }
 
 
-def map_cache_to_order(data: dict):
-    data = json.loads(data)
+def map_cache_to_order(data: dict) -> Order:
+    """Преобразует словарь данных заказа из кэша в объект Order с продуктами."""
     return Order(
         id=int(data["order_id"]),
         customer_name=data["customer_name"],
@@ -0,0 +1,17 @@
+from app.domain.models import User
+
+
+def map_user_to_cache_data(user: User) -> dict:
+    """Преобразует объект User в словарь для кэша аутентификации без хэша пароля."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+        "is_verified": user.is_verified,
+    }
+
+
+def map_cache_to_user(data: dict) -> User:
+    """Преобразует данные пользователя из кэша или токена в объект User, не привязанный к сессии."""
+    return User(**data, hashed_password="")
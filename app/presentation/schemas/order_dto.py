@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 from .product_dto import ProductDTO
 
@@ -22,3 +22,24 @@ class OrderResponseDTO(BaseModel):
     status: str
     total_price: int
     products: List[ProductDTO]
+
+
+class OrderPageDTO(BaseModel):
+    items: List[OrderResponseDTO]
+    next_cursor: Optional[str] = None
+
+
+class BulkOrderErrorDTO(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkOrderResponseDTO(BaseModel):
+    created: List[OrderResponseDTO]
+    errors: List[BulkOrderErrorDTO]
+
+
+class OrderStatusStatsDTO(BaseModel):
+    status: str
+    count: int
+    revenue: int
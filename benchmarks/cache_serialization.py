@@ -0,0 +1,72 @@
+"""Сравнение кодеков кэша заказов: время кодирования/декодирования и размер записи.
+
+Запуск: python -m benchmarks.cache_serialization [--number 2000]
+"""
+
+import argparse
+import timeit
+
+from app.domain.models import Order, Product
+from app.domain.models.order import OrderStatus
+from app.infrastructure.serializers import (
+    SERIALIZERS,
+    encode_entry,
+    decode_entry,
+    get_serializer,
+)
+from app.presentation.mappers.order_mapper import map_order_to_cache_data
+
+# Типичные размеры заказов: количество продуктов в заказе.
+ORDER_SIZES = (1, 5, 20, 100)
+
+
+def make_order(products_count: int) -> Order:
+    """Собирает заказ с заданным количеством продуктов, как после загрузки из БД."""
+    order = Order(
+        id=123456,
+        customer_name="Иван Петров",
+        status=OrderStatus.CONFIRMED,
+        total_price=0,
+        user_id=42,
+        products=[
+            Product(name=f"Товар №{i}", price=100 + i, quantity=1 + i % 5)
+            for i in range(products_count)
+        ],
+    )
+    order.total_price = sum(p.price * p.quantity for p in order.products)
+    return order
+
+
+def make_order_data(products_count: int) -> dict:
+    """Собирает данные кэша для заказа с заданным количеством продуктов."""
+    return map_order_to_cache_data(make_order(products_count))
+
+
+def main(number: int) -> None:
+    print(
+        f"{'кодек':<8} {'продуктов':>9} {'байт':>7} {'encode, мкс':>12} {'decode, мкс':>12}"
+    )
+    for products_count in ORDER_SIZES:
+        data = make_order_data(products_count)
+        for name in SERIALIZERS:
+            try:
+                serializer = get_serializer(name)
+            except ValueError:
+                print(f"{name:<8} не установлен")
+                continue
+            entry = encode_entry(serializer, data)
+            assert decode_entry(entry) == data
+            encode = timeit.timeit(
+                lambda: encode_entry(serializer, data), number=number
+            )
+            decode = timeit.timeit(lambda: decode_entry(entry), number=number)
+            print(
+                f"{name:<8} {products_count:>9} {len(entry):>7} "
+                f"{encode / number * 1e6:>12.2f} {decode / number * 1e6:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="повторов на замер")
+    main(parser.parse_args().number)
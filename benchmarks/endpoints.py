@@ -0,0 +1,344 @@
+"""Нагрузочный замер эндпоинтов заказов на приложении в том же процессе (ASGITransport).
+
+Приложение подключается к SQLite (во временном файле: база в памяти — одно соединение
+на все запросы, что не выдерживает конкурентной нагрузки) так же, как в тестах, и к
+FakeRedis или к Redis из настроек. База заполняется пользователями и заказами с
+разным числом продуктов, затем каждый сценарий прогоняется с заданной
+конкурентностью. Для каждого сценария выводятся p50/p95/p99 задержки и пропускная
+способность, результаты сохраняются в JSON.
+
+С --baseline результаты сравниваются с сохранённым ранее файлом: если p95 какого-то
+сценария вырос больше чем на --threshold, скрипт завершается с кодом 1.
+
+Запуск: python -m benchmarks.endpoints [--orders 10000] [--concurrency 10]
+    [--requests 500] [--output endpoints.json] [--baseline old.json --threshold 0.2]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.application.users.transport import get_jwt_strategy
+from app.core.logging import logger
+from app.domain.models import Base, Order, Product, User
+from app.domain.models.order import OrderStatus
+from app.infrastructure import redis_cache
+from app.infrastructure.db_connection import get_async_session, get_read_async_session
+from app.main import app
+
+USERS = 100
+SEED_CHUNK = 5000
+# Число продуктов в заказе и его вероятность: большинство заказов небольшие.
+PRODUCT_COUNTS = (1, 2, 3, 5, 10, 30)
+PRODUCT_WEIGHTS = (30, 25, 20, 15, 8, 2)
+BATCH_SIZE = 20
+BULK_SIZE = 50
+
+Scenario = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+def random_products(rng: random.Random) -> List[dict]:
+    count = rng.choices(PRODUCT_COUNTS, PRODUCT_WEIGHTS)[0]
+    return [
+        {
+            "name": f"Product {rng.randrange(1000)}",
+            "price": rng.randrange(1, 5000),
+            "quantity": rng.randrange(1, 5),
+        }
+        for _ in range(count)
+    ]
+
+
+async def seed(session_maker: async_sessionmaker, orders: int, rng: random.Random):
+    """Заполняет базу пользователями и заказами; заказы распределяются по пользователям равномерно."""
+    statuses = list(OrderStatus)
+    async with session_maker() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "email": f"user{user_id}@example.com",
+                    "hashed_password": "-",
+                    "is_active": True,
+                    "is_superuser": user_id == 1,
+                    "is_verified": True,
+                }
+                for user_id in range(1, USERS + 1)
+            ],
+        )
+        # Время создания задаётся явно: оно входит во внешний ключ продуктов.
+        created_at = datetime.now(timezone.utc)
+        for start in range(1, orders + 1, SEED_CHUNK):
+            order_rows, product_rows = [], []
+            for order_id in range(start, min(start + SEED_CHUNK, orders + 1)):
+                products = random_products(rng)
+                order_rows.append(
+                    {
+                        "id": order_id,
+                        "customer_name": f"Customer {order_id}",
+                        "status": rng.choice(statuses),
+                        "total_price": sum(
+                            p["price"] * p["quantity"] for p in products
+                        ),
+                        "user_id": order_id % USERS + 1,
+                        "is_deleted": False,
+                        "created_at": created_at,
+                    }
+                )
+                product_rows.extend(
+                    {**p, "order_id": order_id, "order_created_at": created_at}
+                    for p in products
+                )
+            await session.execute(insert(Order), order_rows)
+            await session.execute(insert(Product), product_rows)
+        await session.commit()
+
+
+def build_scenarios(
+    orders: int, rng: random.Random, user_headers: dict
+) -> Dict[str, Scenario]:
+    """Сценарии по эндпоинтам order.py; i — порядковый номер запроса в сценарии.
+
+    Списки и выгрузку запрашивает обычный пользователь, остальное — администратор.
+    """
+    own_order = lambda i: (i * 7919) % orders + 1  # noqa: E731
+    deleted = itertools.count(orders, -1)
+
+    def order_body() -> dict:
+        return {
+            "customer_name": "Benchmark",
+            "status": "pending",
+            "products": random_products(rng),
+        }
+
+    return {
+        "get_order": lambda client, i: client.get(f"/orders/{own_order(i)}"),
+        "list": lambda client, i: client.get(
+            "/orders/all?limit=100", headers=user_headers
+        ),
+        "list_filtered": lambda client, i: client.get(
+            "/orders/all?status=confirmed&min_price=1000&order_by=total_price",
+            headers=user_headers,
+        ),
+        "list_admin": lambda client, i: client.get("/orders/all?limit=100"),
+        "batch": lambda client, i: client.get(
+            "/orders/batch",
+            params={"ids": [own_order(i + j) for j in range(BATCH_SIZE)]},
+        ),
+        "stream": lambda client, i: client.get(
+            "/orders/all",
+            headers={**user_headers, "Accept": "application/x-ndjson"},
+        ),
+        "create": lambda client, i: client.post("/orders/create", json=order_body()),
+        "bulk": lambda client, i: client.post(
+            "/orders/bulk", json=[order_body() for _ in range(BULK_SIZE)]
+        ),
+        "update": lambda client, i: client.put(
+            f"/orders/update/{own_order(i)}", json=order_body()
+        ),
+        "delete": lambda client, i: client.delete(f"/orders/delete/{next(deleted)}"),
+    }
+
+
+def percentile(quantiles: List[float], p: int) -> float:
+    return quantiles[p - 1]
+
+
+async def run_scenario(
+    client: AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> dict:
+    """Выполняет requests запросов сценария в concurrency параллельных потоков запросов."""
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            started = time.perf_counter()
+            response = await scenario(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(quantiles, 50) * 1000,
+        "p95_ms": percentile(quantiles, 95) * 1000,
+        "p99_ms": percentile(quantiles, 99) * 1000,
+        "rps": requests / elapsed,
+    }
+
+
+def use_fake_redis() -> None:
+    """Подменяет клиент Redis приложения на FakeRedis в памяти процесса."""
+    from fakeredis.aioredis import FakeRedis
+
+    fake_redis = FakeRedis()
+    redis_cache.redis_client = fake_redis
+    redis_cache.cache_write_queue.redis = fake_redis
+
+
+async def run(args: argparse.Namespace, database: str) -> dict:
+    rng = random.Random(args.seed)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    started = time.perf_counter()
+    await seed(session_maker, args.orders, rng)
+    print(f"Заполнено {args.orders} заказов за {time.perf_counter() - started:.1f} с")
+    print(
+        f"{'сценарий':<14} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'rps':>9} {'ошибок':>7}"
+    )
+
+    async def override_get_async_session():
+        async with session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_read_async_session] = override_get_async_session
+    if args.redis == "fake":
+        use_fake_redis()
+    else:
+        await redis_cache.redis_client.flushdb()
+
+    # Администратор видит все заказы, поэтому чтение и изменение любых заказов разрешено.
+    strategy = get_jwt_strategy()
+    token = await strategy.write_token(User(id=1, email="user1@example.com"))
+    user_token = await strategy.write_token(User(id=2, email="user2@example.com"))
+    results = {}
+    async with AsyncClient(
+        base_url="http://benchmark",
+        transport=ASGITransport(app=app),
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=None,
+    ) as client:
+        scenarios = build_scenarios(
+            args.orders, rng, {"Authorization": f"Bearer {user_token}"}
+        )
+        for name in args.scenarios or scenarios:
+            results[name] = await run_scenario(
+                client, scenarios[name], args.requests, args.concurrency
+            )
+            result = results[name]
+            print(
+                f"{name:<14} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['rps']:>9.1f} {result['errors']:>7}"
+            )
+    await redis_cache.cache_write_queue.stop()
+    await engine.dispose()
+    return results
+
+
+def compare_results(
+    baseline: Dict[str, dict], current: Dict[str, dict], threshold: float
+) -> List[str]:
+    """Возвращает описания сценариев, у которых p95 вырос больше чем на threshold (доля)."""
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["p95_ms"], result["p95_ms"]
+        if after > before * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {before:.2f} мс -> {after:.2f} мс (+{(after / before - 1):.0%})"
+            )
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    logger.setLevel(logging.WARNING)
+    print(
+        f"{args.orders} заказов, {args.requests} запросов на сценарий, "
+        f"конкурентность {args.concurrency}, Redis: {args.redis}"
+    )
+    if args.database:
+        results = asyncio.run(run(args, args.database))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = asyncio.run(run(args, f"{directory}/orders.db"))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "python": platform.python_version(),
+                        "orders": args.orders,
+                        "requests": args.requests,
+                        "concurrency": args.concurrency,
+                        "redis": args.redis,
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Результаты сохранены в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"Регрессии больше {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"Регрессий больше {args.threshold:.0%} нет")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=10000, help="заказов в базе")
+    parser.add_argument(
+        "--requests", type=int, default=500, help="запросов на сценарий"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="параллельных запросов"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", help="сценарии для запуска (по умолчанию все)"
+    )
+    parser.add_argument(
+        "--database",
+        help="файл SQLite (по умолчанию временный)",
+    )
+    parser.add_argument(
+        "--redis",
+        choices=("fake", "real"),
+        default="fake",
+        help="FakeRedis или Redis из настроек",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="seed генератора данных")
+    parser.add_argument("--output", help="файл для результатов в JSON")
+    parser.add_argument("--baseline", help="JSON с результатами для сравнения")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="допустимый рост p95 (доля)"
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""Проверка планов запросов списка заказов на PostgreSQL.
+
+Для каждой комбинации фильтров из OrderService.get_orders строится тот же запрос,
+что выполняет репозиторий, и выводится его EXPLAIN. Seq scan при этом отключён:
+если в плане всё равно остаётся Seq Scan, под такую форму запроса нет индекса,
+и время ответа списка будет расти вместе с таблицей. В этом случае скрипт
+завершается с кодом 1, поэтому его можно запускать в CI после миграций.
+
+Запуск: python -m benchmarks.explain_orders [--analyze]
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.application.repositories.order_repo import build_orders_query
+from app.application.services.order_service import OrderService, DEFAULT_PAGE_SIZE
+from app.domain.models import Product
+from app.infrastructure.db_connection import engine
+
+# Название формы запроса -> (фильтры OrderService.get_orders, order_by, keyset-ключ).
+QUERY_SHAPES = {
+    "user": ({"user_id": 1}, "id", None),
+    "user, next page": ({"user_id": 1}, "id", [1000]),
+    "user + status": ({"user_id": 1, "status": "pending"}, "id", None),
+    "user + status + price": (
+        {"user_id": 1, "status": "pending", "min_price": 100, "max_price": 5000},
+        "total_price",
+        None,
+    ),
+    "user + price, next page": (
+        {"user_id": 1, "min_price": 100},
+        "total_price",
+        [500, 1000],
+    ),
+    "admin + status + price": (
+        {"status": "confirmed", "min_price": 100, "max_price": 5000},
+        "total_price",
+        None,
+    ),
+    "admin + price": ({"min_price": 100, "max_price": 5000}, "total_price", None),
+}
+
+
+def _compile(query) -> str:
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _queries():
+    """Возвращает пары (название, SQL) для всех проверяемых форм запросов."""
+    for name, (params, order_by, after) in QUERY_SHAPES.items():
+        filters = OrderService._build_filters(
+            params.get("user_id"),
+            params.get("status"),
+            params.get("min_price"),
+            params.get("max_price"),
+        )
+        query = build_orders_query(
+            filters, limit=DEFAULT_PAGE_SIZE + 1, order_by=order_by, after=after
+        )
+        yield name, _compile(query)
+    # Запрос, который selectinload(Order.products) выполняет для каждой страницы.
+    products = select(Product).where(
+        Product.order_id.in_(range(1, DEFAULT_PAGE_SIZE + 1))
+    )
+    yield "products for page", _compile(products)
+
+
+async def main(analyze: bool) -> int:
+    explain = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+    failed = []
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for name, sql in _queries():
+            result = await conn.execute(text(f"{explain} {sql}"))
+            plan = [row[0] for row in result]
+            print(f"=== {name}\n{sql}\n" + "\n".join(plan) + "\n")
+            if any("Seq Scan" in line for line in plan):
+                failed.append(name)
+    await engine.dispose()
+
+    if failed:
+        print("Нет подходящего индекса для: " + ", ".join(failed))
+        return 1
+    print("Все формы запросов обслуживаются индексами.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--analyze", action="store_true", help="выполнить запросы (EXPLAIN ANALYZE)"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.analyze)))
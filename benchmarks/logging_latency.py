@@ -0,0 +1,96 @@
+"""Задержка цикла событий при логировании на медленный диск: запись напрямую и через очередь.
+
+Занятость диска имитируется задержкой в каждой записи файлового обработчика. Пока
+запросы пишут в лог, фоновая задача замеряет опоздание пробуждений цикла событий,
+как в benchmarks.password_hashing.
+
+Запуск: python -m benchmarks.logging_latency [--messages 2000] [--disk-delay-ms 1]
+"""
+
+import argparse
+import asyncio
+import logging
+import queue
+import statistics
+import tempfile
+import time
+from logging.handlers import QueueListener
+from typing import List
+
+from app.core.logging import DroppingQueueHandler
+from benchmarks.password_hashing import probe_loop_lag
+
+REQUESTS = 50
+
+
+class SlowFileHandler(logging.FileHandler):
+    """Файловый обработчик, каждая запись которого занимает не меньше delay секунд."""
+
+    def __init__(self, filename: str, delay: float):
+        super().__init__(filename)
+        self.write_delay = delay
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(self.write_delay)
+        super().emit(record)
+
+
+async def run(mode: str, messages: int, disk_delay: float, path: str) -> None:
+    file_handler = SlowFileHandler(path, disk_delay)
+    logger = logging.getLogger(f"benchmark.{mode}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    listener = None
+    if mode == "direct":
+        logger.addHandler(file_handler)
+        handler = file_handler
+    else:
+        handler = DroppingQueueHandler(queue.Queue(messages))
+        logger.addHandler(handler)
+        listener = QueueListener(handler.queue, file_handler)
+        listener.start()
+
+    async def request(number: int) -> None:
+        for i in range(messages // REQUESTS):
+            logger.info(f"User {number} created order {i}")
+            await asyncio.sleep(0)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await asyncio.gather(*(request(n) for n in range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    if listener:
+        listener.stop()
+    logger.removeHandler(handler)
+    file_handler.close()
+
+    lags.sort()
+    print(
+        f"{mode:<7} {elapsed:>9.2f} {statistics.median(lags):>9.2f} "
+        f"{lags[int(len(lags) * 0.99) - 1]:>9.2f} {lags[-1]:>9.2f}"
+    )
+
+
+def main(messages: int, disk_delay: float) -> None:
+    print(
+        f"{messages} записей от {REQUESTS} запросов, запись на диск {disk_delay * 1000:g} мс"
+    )
+    print(f"{'режим':<7} {'всего, с':>9} {'p50, мс':>9} {'p99, мс':>9} {'max, мс':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("direct", "queue"):
+            asyncio.run(run(mode, messages, disk_delay, f"{directory}/{mode}.log"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000, help="записей в лог")
+    parser.add_argument(
+        "--disk-delay-ms", type=float, default=1.0, help="задержка записи на диск"
+    )
+    args = parser.parse_args()
+    main(args.messages, args.disk_delay_ms / 1000)
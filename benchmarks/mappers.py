@@ -0,0 +1,89 @@
+"""Микробенчмарк мапперов заказа и кодирования записи кэша: время и память на вызов.
+
+Время меряется timeit без трассировки памяти; память — отдельным вызовом под
+tracemalloc как пик выделенного за вызов (байт) и число блоков, оставшихся после
+него (размер результата).
+
+Запуск: python -m benchmarks.mappers [--number 0]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from app.infrastructure.redis_cache import cache_serializer
+from app.infrastructure.serializers import encode_entry, decode_entry
+from app.presentation.mappers.order_mapper import (
+    map_order_to_dto,
+    map_order_to_cache_data,
+    map_cache_to_order,
+    map_cache_data_to_dto,
+)
+from benchmarks.cache_serialization import make_order
+
+ORDER_SIZES = (1, 10, 100, 1000)
+# Число вызовов на замер подбирается так, чтобы каждый замер обрабатывал примерно столько продуктов.
+PRODUCTS_PER_RUN = 200_000
+
+
+def make_cases(products_count: int) -> Dict[str, Callable[[], object]]:
+    order = make_order(products_count)
+    data = map_order_to_cache_data(order)
+    entry = encode_entry(cache_serializer, data)
+    return {
+        "map_order_to_dto": lambda: map_order_to_dto(order),
+        "map_order_to_cache_data": lambda: map_order_to_cache_data(order),
+        "map_cache_to_order": lambda: map_cache_to_order(data),
+        "map_cache_data_to_dto": lambda: map_cache_data_to_dto(data),
+        "encode_entry": lambda: encode_entry(cache_serializer, data),
+        "decode_entry": lambda: decode_entry(entry),
+    }
+
+
+def measure_memory(func: Callable[[], object]) -> Tuple[int, int]:
+    """Возвращает пик выделенной за вызов памяти и число блоков, оставшихся после вызова."""
+    tracemalloc.start()
+    try:
+        before_size, _ = tracemalloc.get_traced_memory()
+        before_blocks = sum(
+            s.count for s in tracemalloc.take_snapshot().statistics("filename")
+        )
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after_blocks = sum(
+            s.count for s in tracemalloc.take_snapshot().statistics("filename")
+        )
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before_size, after_blocks - before_blocks
+
+
+def main(number: int) -> None:
+    print(f"Кодек кэша: {type(cache_serializer).__name__}")
+    print(
+        f"{'функция':<24} {'продуктов':>9} {'мкс/вызов':>11} {'пик, байт':>11} {'блоков':>8}"
+    )
+    for products_count in ORDER_SIZES:
+        calls = number or max(10, PRODUCTS_PER_RUN // products_count)
+        for name, func in make_cases(products_count).items():
+            func()
+            elapsed = timeit.timeit(func, number=calls)
+            peak, blocks = measure_memory(func)
+            print(
+                f"{name:<24} {products_count:>9} {elapsed / calls * 1e6:>11.2f} "
+                f"{peak:>11} {blocks:>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=0,
+        help="вызовов на замер (0 — подобрать по размеру заказа)",
+    )
+    main(parser.parse_args().number)
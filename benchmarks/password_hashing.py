@@ -0,0 +1,73 @@
+"""Задержка цикла событий во время всплеска логинов: проверка пароля в цикле событий и в пуле потоков.
+
+Пока идёт всплеск проверок паролей, фоновая задача раз в миллисекунду замеряет,
+насколько позже запланированного она просыпается. Эта задержка добавляется к
+времени ответа любого запроса воркера, в том числе к чтению заказов из кэша.
+
+Запуск: python -m benchmarks.password_hashing [--logins 50] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from fastapi_users.password import PasswordHelper
+
+from app.infrastructure.password_hashing import PasswordHashPool
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe_loop_lag(lags: List[float], stop: asyncio.Event) -> None:
+    """Замеряет опоздание пробуждений цикла событий в миллисекундах."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((loop.time() - started - PROBE_INTERVAL) * 1000)
+
+
+async def run(mode: str, logins: int, workers: int, hashed: str) -> None:
+    helper = PasswordHelper()
+    pool = PasswordHashPool(workers, queue_size=logins, helper=helper)
+
+    async def login() -> None:
+        if mode == "inline":
+            helper.verify_and_update("password", hashed)
+        else:
+            await pool.verify_and_update("password", hashed)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    pool.shutdown()
+
+    lags.sort()
+    print(
+        f"{mode:<7} {elapsed:>9.2f} {statistics.median(lags):>9.2f} "
+        f"{lags[int(len(lags) * 0.99) - 1]:>9.2f} {lags[-1]:>9.2f}"
+    )
+
+
+def main(logins: int, workers: int) -> None:
+    hashed = PasswordHelper().hash("password")
+    print(f"{logins} проверок пароля, потоков в пуле: {workers}")
+    print(f"{'режим':<7} {'всего, с':>9} {'p50, мс':>9} {'p99, мс':>9} {'max, мс':>9}")
+    for mode in ("inline", "pool"):
+        asyncio.run(run(mode, logins, workers, hashed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50, help="проверок пароля")
+    parser.add_argument("--workers", type=int, default=4, help="потоков в пуле")
+    args = parser.parse_args()
+    main(args.logins, args.workers)
@@ -1,4 +1,5 @@
 import asyncio
+import os
 from typing import AsyncGenerator, Any, Generator
 
 import pytest
@@ -8,11 +9,16 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy import select, Result
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
+# Тесты пишут журнал только в консоль, а не в файл в дереве исходников; настройки
+# читаются при первом импорте app, поэтому переменная задаётся до него.
+os.environ.setdefault("LOG_FILE", "")
+
 from app.domain.models import Base, User, Order
 from app.domain.models.order import OrderStatus
 
-from app.infrastructure.db_connection import get_async_session
-from app.infrastructure.redis_cache import redis_client
+from app.infrastructure.db_connection import get_async_session, get_read_async_session
+from app.infrastructure.metrics import instrument_engine, setup_metrics
+from app.infrastructure.redis_cache import redis_client, cache_write_queue
 from app.main import app
 
 engine = create_async_engine(
@@ -20,6 +26,10 @@ engine = create_async_engine(
     connect_args={"check_same_thread": False},
 )
 
+instrument_engine(engine, "test")
+# ASGITransport не запускает lifespan, поэтому сборщики регистрируются здесь.
+setup_metrics()
+
 TestingSessionLocal = async_sessionmaker(
     expire_on_commit=False,
     autocommit=False,
@@ -30,12 +40,15 @@ TestingSessionLocal = async_sessionmaker(
 
 @pytest_asyncio.fixture(autouse=True)
 async def init_db() -> AsyncGenerator[None, Any]:
-    """Инициализирует и очищает базу данных для каждого теста."""
+    """Инициализирует и очищает базу данных и кэш для каждого теста."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # Идентификаторы заказов повторяются между тестами, поэтому кэш тоже очищается.
+    await cache_write_queue.flush()
+    await redis_client.flushdb()
 
 
 async def override_get_async_session() -> Generator[AsyncSession, Any, None]:
@@ -52,9 +65,38 @@ async def override_get_aioredis() -> Generator[FakeRedis, Any, None]:
 
 
 app.dependency_overrides[get_async_session] = override_get_async_session
+app.dependency_overrides[get_read_async_session] = override_get_async_session
 app.dependency_overrides[redis_client] = override_get_aioredis
 
 
+class GatedRedis:
+    """Клиент Redis, пайплайны которого выполняются только после открытия gate: имитирует медленный Redis."""
+
+    def __init__(self, redis, gate: asyncio.Event):
+        self.redis = redis
+        self.gate = gate
+
+    def pipeline(self, **kwargs):
+        pipe = self.redis.pipeline(**kwargs)
+        execute = pipe.execute
+
+        async def gated_execute(*args, **kw):
+            await self.gate.wait()
+            return await execute(*args, **kw)
+
+        pipe.execute = gated_execute
+        return pipe
+
+
+@pytest.fixture
+def backlogged_cache_queue(monkeypatch) -> asyncio.Event:
+    """Задерживает фоновую запись в кэш, пока тест не откроет возвращённое событие."""
+    gate = asyncio.Event()
+    monkeypatch.setattr(cache_write_queue, "redis", GatedRedis(redis_client, gate))
+    yield gate
+    gate.set()
+
+
 @pytest_asyncio.fixture
 async def get_test_session() -> Generator[AsyncSession, Any, None]:
     """Возвращает сессию базы данных для тестов."""
@@ -0,0 +1,92 @@
+import pytest
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import event
+
+from app.application.users.user_manager import UserManager
+from app.core import settings
+from app.domain.models import User
+from app.infrastructure.redis_cache import cache_write_queue
+from app.presentation.schemas.user_dto import UserUpdate
+from tests.conftest import engine
+
+
+@pytest.fixture
+def user_queries():
+    """Собирает запросы к таблице пользователей, выполненные во время теста."""
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM "user"' in statement or "FROM user" in statement:
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+
+@pytest.mark.asyncio
+async def test_authenticated_user_is_cached(login_admin_user, user_queries):
+    """Тест на то, что пользователь загружается из БД только при первом запросе с токеном."""
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/all")
+    assert response.status_code == 200
+    assert len(user_queries) == 1
+    await cache_write_queue.flush()
+
+    response = await async_client.get("/orders/all")
+    assert response.status_code == 200
+    assert len(user_queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidated_on_update(login_admin_user, get_test_session):
+    """Тест на то, что деактивация пользователя действует сразу, несмотря на кэш."""
+    async_client, user = login_admin_user
+    assert (await async_client.get("/orders/all")).status_code == 200
+    await cache_write_queue.flush()
+
+    async with get_test_session as session:
+        user_manager = UserManager(SQLAlchemyUserDatabase(session, User))
+        db_user = await user_manager.get(user.id)
+        await user_manager.update(UserUpdate(is_active=False), db_user, safe=False)
+
+    assert (await async_client.get("/orders/all")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_token_claims_skip_user_lookup(
+    monkeypatch, login_admin_user, user_queries
+):
+    """Тест на аутентификацию по подписанным в токене флагам пользователя без обращения к БД."""
+    monkeypatch.setattr(settings, "AUTH_TOKEN_CLAIMS", True)
+    async_client, user = login_admin_user
+    response = await async_client.post(
+        "/auth/login",
+        data={"username": user.email, "password": "123", "grant_type": "password"},
+    )
+    async_client.headers.update(
+        {"Authorization": f"Bearer {response.json()['access_token']}"}
+    )
+    user_queries.clear()
+
+    response = await async_client.get("/orders/all")
+    assert response.status_code == 200
+    assert user_queries == []
+
+
+@pytest.mark.asyncio
+async def test_deactivation_wins_over_queued_user_cache(
+    backlogged_cache_queue, login_admin_user, get_test_session
+):
+    """Тест на деактивацию пользователя, пока запись его кэша ещё ждёт в очереди записи."""
+    async_client, user = login_admin_user
+    assert (await async_client.get("/orders/all")).status_code == 200
+
+    async with get_test_session as session:
+        user_manager = UserManager(SQLAlchemyUserDatabase(session, User))
+        db_user = await user_manager.get(user.id)
+        await user_manager.update(UserUpdate(is_active=False), db_user, safe=False)
+
+    backlogged_cache_queue.set()
+    await cache_write_queue.flush()
+    assert (await async_client.get("/orders/all")).status_code == 401
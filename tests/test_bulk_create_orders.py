@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_orders(login_admin_user):
+    """Тест на пакетное создание заказов с ошибкой в одном из них."""
+    orders_data = [
+        {
+            "customer_name": "John Doe",
+            "status": "pending",
+            "products": [
+                {"name": "Laptop", "price": 1000, "quantity": 1},
+                {"name": "Mouse", "price": 50, "quantity": 2},
+            ],
+        },
+        {
+            "customer_name": "Broken",
+            "status": "new",
+            "products": [{"name": "Laptop", "price": 1000, "quantity": 1}],
+        },
+        {
+            "customer_name": "Jane",
+            "status": "confirmed",
+            "products": [{"name": "Phone", "price": 300, "quantity": 3}],
+        },
+    ]
+
+    async_client, user = login_admin_user
+    response = await async_client.post("/orders/bulk", json=orders_data)
+
+    assert response.status_code == 201
+    data = response.json()
+    assert [o["customer_name"] for o in data["created"]] == ["John Doe", "Jane"]
+    assert [o["total_price"] for o in data["created"]] == [1100, 900]
+    assert len(data["created"][0]["products"]) == 2
+    assert len(data["errors"]) == 1
+    assert data["errors"][0]["index"] == 1
+
+    order_id = data["created"][1]["order_id"]
+    response = await async_client.get(f"/orders/{order_id}")
+    assert response.status_code == 200
+    assert response.json()["products"] == orders_data[2]["products"]
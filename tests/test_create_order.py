@@ -1,4 +1,9 @@
 import pytest
+from sqlalchemy import event
+
+from app.application.repositories.order_repo import OrderRepository
+from app.domain.models import Order, Product
+from tests.conftest import engine
 
 
 @pytest.mark.asyncio
@@ -41,3 +46,39 @@ async def test_create_wrong_order(login_admin_user):
     assert response.status_code == 400
     data = response.json()
     assert "detail" in data
+
+
+@pytest.mark.asyncio
+async def test_create_order_round_trips(get_test_session, test_user):
+    """Тест на количество запросов к БД при создании заказа."""
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    order = Order(
+        customer_name="John Doe",
+        total_price=1100,
+        user_id=test_user.id,
+        products=[
+            Product(name="Laptop", price=1000, quantity=1),
+            Product(name="Mouse", price=50, quantity=2),
+        ],
+    )
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    try:
+        async with get_test_session as session:
+            created_order = await OrderRepository(session).create(order)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    # Заказ, его продукты, изменения сводки order_stats и итогов order_stats_totals.
+    # Продукты вставляются с RETURNING в порядке параметров: PostgreSQL делает это одним
+    # INSERT, а SQLite — отдельным INSERT на каждую строку.
+    product_statements = 2 if engine.dialect.name == "sqlite" else 1
+    assert len(statements) == 3 + product_statements
+    assert all(s.lstrip().upper().startswith("INSERT") for s in statements)
+    assert created_order.id is not None
+    assert [p.name for p in created_order.products] == ["Laptop", "Mouse"]
+    assert all(p.order_id == created_order.id for p in created_order.products)
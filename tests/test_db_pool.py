@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.db_pool import TimedQueuePool
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkout_waits(tmp_path):
+    """Тест на учёт ожиданий соединения, таймаутов и заполненности пула."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    pool = engine.sync_engine.pool
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert pool.saturation() == 1.0
+
+        async def wait_for_connection():
+            async with engine.connect():
+                pass
+
+        with pytest.raises(exc.TimeoutError):
+            await wait_for_connection()
+
+        # Второй запрос дожидается освобождения соединения.
+        waiter = asyncio.create_task(wait_for_connection())
+        await asyncio.sleep(0.05)
+    await waiter
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 3
+    assert stats["timeouts"] == 1
+    assert stats["wait_max"] >= 0.1
+    assert stats["checked_out"] == 0
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_excludes_connect(tmp_path):
+    """Тест на то, что открытие нового соединения не считается ожиданием пула, а пул без ограничения не заполнен."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=-1,
+    )
+    pool = engine.sync_engine.pool
+    invoke_creator = pool._invoke_creator
+
+    def slow_creator(record):
+        time.sleep(0.1)
+        return invoke_creator(record)
+
+    pool._invoke_creator = slow_creator
+
+    async with engine.connect() as first, engine.connect() as second:
+        await first.execute(text("SELECT 1"))
+        await second.execute(text("SELECT 1"))
+        assert pool.saturation() == 0.0
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["wait_max"] < 0.1
+    await engine.dispose()
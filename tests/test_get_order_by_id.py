@@ -1,5 +1,7 @@
 import pytest
 
+from app.infrastructure.redis_cache import set_order_cache
+
 
 @pytest.mark.asyncio
 async def test_get_order_by_id(get_test_session, login_admin_user, create_orders):
@@ -38,3 +40,32 @@ async def test_get_order_by_non_existent_id(get_test_session, login_admin_user):
     data = response.json()
 
     assert data["detail"] == "Order not found"
+
+
+@pytest.mark.asyncio
+async def test_get_order_from_cache_forbidden(get_test_session, login_regular_user):
+    """Тест на проверку владельца заказа по данным из кэша"""
+    async_client, user = login_regular_user
+    order_data = {
+        "order_id": 1,
+        "customer_name": "John Doe",
+        "status": "pending",
+        "total_price": 100,
+        "user_id": user.id + 1,
+        "products": [{"name": "Laptop", "price": 100, "quantity": 1}],
+    }
+    await set_order_cache(1, order_data)
+
+    response = await async_client.get("/orders/1")
+    assert response.status_code == 403
+
+    await set_order_cache(1, {**order_data, "user_id": user.id})
+    response = await async_client.get("/orders/1")
+    assert response.status_code == 200
+    assert response.json() == {
+        "order_id": 1,
+        "customer_name": "John Doe",
+        "status": "pending",
+        "total_price": 100,
+        "products": [{"name": "Laptop", "price": 100, "quantity": 1}],
+    }
@@ -1,4 +1,11 @@
+import json
+from datetime import datetime
+
 import pytest
+from sqlalchemy import update
+
+from app.domain.models import Order
+from app.infrastructure.redis_cache import cache_write_queue
 
 
 @pytest.mark.asyncio
@@ -7,7 +14,7 @@ async def test_get_all_orders(login_admin_user, get_test_session, create_orders)
     async_client, user = login_admin_user
     response = await async_client.get("/orders/all")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 4
     assert data[0]["status"] == "pending"
     assert data[1]["status"] == "confirmed"
@@ -21,7 +28,7 @@ async def test_get_orders_by_status(login_admin_user, get_test_session, create_o
     response = await async_client.get("/orders/all?status=confirmed")
 
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
 
     assert len(data) == 1
     assert data[0]["status"] == "confirmed"
@@ -33,8 +40,138 @@ async def test_get_orders_for_user(login_regular_user, get_test_session, create_
     async_client, user = login_regular_user
     response = await async_client.get("/orders/all")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
 
     assert len(data) == 3
     assert data[0]["customer_name"] == "John Doe"
     assert data[1]["customer_name"] == "Jane33"
+
+
+@pytest.mark.asyncio
+async def test_get_orders_pagination(login_admin_user, get_test_session, create_orders):
+    """Тест на постраничное получение заказов по курсору"""
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/all?limit=3")
+    assert response.status_code == 200
+    page = response.json()
+    assert [o["order_id"] for o in page["items"]] == [1, 2, 3]
+    assert page["next_cursor"]
+
+    response = await async_client.get(
+        "/orders/all", params={"limit": 3, "cursor": page["next_cursor"]}
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert [o["order_id"] for o in page["items"]] == [4]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_orders_pagination_by_price(
+    login_admin_user, get_test_session, create_orders
+):
+    """Тест на постраничное получение заказов с сортировкой по стоимости"""
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/all?limit=2&order_by=total_price")
+    page = response.json()
+    assert [o["total_price"] for o in page["items"]] == [100, 200]
+
+    response = await async_client.get(
+        "/orders/all",
+        params={"limit": 2, "order_by": "total_price", "cursor": page["next_cursor"]},
+    )
+    page = response.json()
+    assert [o["order_id"] for o in page["items"]] == [3, 4]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_orders_invalid_cursor(login_admin_user, get_test_session):
+    """Тест на получение заказов с повреждённым курсором"""
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/all?cursor=broken")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.asyncio
+async def test_get_orders_ndjson_stream(
+    login_admin_user, get_test_session, create_orders
+):
+    """Тест на потоковую выгрузку заказов в формате NDJSON"""
+    async_client, user = login_admin_user
+    response = await async_client.get(
+        "/orders/all?limit=1",
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [o["order_id"] for o in lines] == [1, 2, 3, 4]
+    assert lines[1]["status"] == "confirmed"
+
+
+@pytest.mark.asyncio
+async def test_get_orders_cached_until_write(
+    login_regular_user, get_test_session, create_orders
+):
+    """Тест на кэширование списка заказов до изменения заказов пользователя"""
+    async_client, user = login_regular_user
+    response = await async_client.get("/orders/all?status=pending")
+    assert [o["customer_name"] for o in response.json()["items"]] == ["John Doe"]
+    await cache_write_queue.flush()
+
+    # Изменение в обход сервиса не инвалидирует кэш: ответ берётся из Redis.
+    async with get_test_session as session:
+        await session.execute(
+            update(Order).where(Order.id == 1).values(customer_name="Changed")
+        )
+        await session.commit()
+    response = await async_client.get("/orders/all?status=pending")
+    assert [o["customer_name"] for o in response.json()["items"]] == ["John Doe"]
+
+    order_data = {
+        "customer_name": "New",
+        "status": "pending",
+        "products": [{"name": "Laptop", "price": 1000, "quantity": 1}],
+    }
+    response = await async_client.post("/orders/create", json=order_data)
+    assert response.status_code == 201
+
+    response = await async_client.get("/orders/all?status=pending")
+    assert [o["customer_name"] for o in response.json()["items"]] == [
+        "Changed",
+        "New",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_orders_by_created_at(
+    login_admin_user, get_test_session, create_orders
+):
+    """Тест на фильтрацию заказов по времени создания: created_to не включается"""
+    async_client, user = login_admin_user
+    async with get_test_session as session:
+        for order_id, created_at in enumerate(
+            ["2026-08-15", "2026-09-01", "2026-09-20", "2026-10-01"], start=1
+        ):
+            await session.execute(
+                update(Order)
+                .where(Order.id == order_id)
+                .values(created_at=datetime.fromisoformat(created_at))
+            )
+        await session.commit()
+
+    response = await async_client.get(
+        "/orders/all",
+        params={"created_from": "2026-09-01T00:00:00", "created_to": "2026-10-01"},
+    )
+    assert response.status_code == 200
+    assert [o["order_id"] for o in response.json()["items"]] == [2, 3]
+
+    response = await async_client.get(
+        "/orders/all", params={"created_from": "2026-09-10T00:00:00"}
+    )
+    assert [o["order_id"] for o in response.json()["items"]] == [3, 4]
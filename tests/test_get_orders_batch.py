@@ -0,0 +1,45 @@
+import pytest
+
+from app.infrastructure.redis_cache import get_orders_cache, cache_write_queue
+
+
+@pytest.mark.asyncio
+async def test_get_orders_batch(login_admin_user, get_test_session, create_orders):
+    """Тест на получение нескольких заказов по списку id"""
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/batch?ids=3&ids=1&ids=999&ids=3")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [o["order_id"] for o in data] == [3, 1]
+    assert data[0]["customer_name"] == "Bob"
+
+    # Загруженные из БД заказы попадают в кэш фоновой записью.
+    await cache_write_queue.flush()
+    assert set(await get_orders_cache([1, 3])) == {1, 3}
+
+    response = await async_client.get("/orders/batch?ids=1&ids=2")
+    assert [o["order_id"] for o in response.json()] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_orders_batch_skips_foreign_orders(
+    login_regular_user, get_test_session, create_orders
+):
+    """Тест на то, что обычный пользователь получает только свои заказы"""
+    async_client, user = login_regular_user
+    response = await async_client.get("/orders/batch?ids=1&ids=4")
+
+    assert response.status_code == 200
+    assert [o["order_id"] for o in response.json()] == [1]
+
+
+@pytest.mark.asyncio
+async def test_get_orders_batch_too_many_ids(login_admin_user):
+    """Тест на ограничение количества id в одном запросе"""
+    async_client, user = login_admin_user
+    response = await async_client.get(
+        "/orders/batch", params={"ids": list(range(1, 202))}
+    )
+
+    assert response.status_code == 400
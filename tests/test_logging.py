@@ -0,0 +1,54 @@
+import json
+import logging
+import queue
+import time
+
+import pytest
+
+from app.core.logging import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    RequestContextFilter,
+    request_context,
+)
+
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("orders", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_queue_handler_drops_on_overflow():
+    """Тест на отбрасывание записей при переполненной очереди логов вместо блокировки."""
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(make_record(f"message {i}"))
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_json_format_with_request_context():
+    """Тест на JSON-формат записи с идентификатором запроса и временем от его начала."""
+    token = request_context.set(("abc", time.perf_counter() - 0.5))
+    try:
+        record = make_record("User 1 created order 2")
+        RequestContextFilter().filter(record)
+    finally:
+        request_context.reset(token)
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["message"] == "User 1 created order 2"
+    assert data["level"] == "INFO"
+    assert data["request_id"] == "abc"
+    assert data["elapsed_ms"] >= 500
+
+
+@pytest.mark.asyncio
+async def test_request_id_header(async_client):
+    """Тест на возврат переданного или сгенерированного идентификатора запроса."""
+    response = await async_client.get("/metrics", headers={"X-Request-ID": "req-1"})
+    assert response.headers["X-Request-ID"] == "req-1"
+
+    response = await async_client.get("/metrics")
+    assert len(response.headers["X-Request-ID"]) == 32
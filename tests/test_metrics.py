@@ -0,0 +1,64 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from app.infrastructure.metrics import setup_metrics
+from app.infrastructure.redis_cache import cache_write_queue
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(login_admin_user, create_orders):
+    """Тест на экспорт задержек маршрутов, операций кэша, SQL-запросов и пула соединений."""
+    async_client, user = login_admin_user
+    route = {"method": "GET", "route": "/orders/{order_id}", "status": "200"}
+    requests_before = sample("http_request_duration_seconds_count", **route)
+    misses_before = sample(
+        "cache_operations_total", cache="order", operation="get", result="miss"
+    )
+    hits_before = sample(
+        "cache_operations_total", cache="order", operation="get", result="hit"
+    )
+    queries_before = sample("db_query_duration_seconds_count", engine="test")
+
+    assert (await async_client.get("/orders/1")).status_code == 200
+    await cache_write_queue.flush()
+    assert (await async_client.get("/orders/1")).status_code == 200
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "db_pool_checked_out" in response.text
+    assert "cache_write_queue_dropped_total" in response.text
+
+    assert sample("http_request_duration_seconds_count", **route) == requests_before + 2
+    assert (
+        sample("cache_operations_total", cache="order", operation="get", result="miss")
+        == misses_before + 1
+    )
+    assert (
+        sample("cache_operations_total", cache="order", operation="get", result="hit")
+        == hits_before + 1
+    )
+    assert sample("db_query_duration_seconds_count", engine="test") > queries_before
+
+
+@pytest.mark.asyncio
+async def test_unmatched_routes_share_one_label(async_client):
+    """Тест на то, что неизвестные пути не порождают отдельных временных рядов."""
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("http_request_duration_seconds_count", **labels)
+
+    await async_client.get("/no/such/path/1")
+    await async_client.get("/no/such/path/2")
+
+    assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_setup_metrics_is_idempotent():
+    """Тест на то, что повторная регистрация сборщиков не падает с Duplicated timeseries."""
+    setup_metrics()
+    setup_metrics()
+    assert REGISTRY.get_sample_value("db_pool_checked_out") is not None
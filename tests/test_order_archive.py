@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.application.repositories.order_repo import OrderRepository
+from app.application.services.order_service import OrderService
+from app.domain.models import Order, OrderArchive, Product, ProductArchive
+from app.domain.models.order import OrderStatus
+
+
+@pytest.mark.asyncio
+async def test_archive_deleted_orders(get_test_session, login_admin_user):
+    """Тест на перенос давно удалённых заказов с продуктами в архив небольшими транзакциями."""
+    async_client, user = login_admin_user
+    async with get_test_session as session:
+        orders = [
+            Order(
+                customer_name=f"Customer {i}",
+                total_price=100,
+                status=OrderStatus.PENDING,
+                user_id=user.id,
+            )
+            for i in range(5)
+        ]
+        session.add_all(orders)
+        await session.flush()
+        # Ключ продукта включает created_at заказа, известный только после вставки.
+        session.add_all(
+            Product(
+                name="Laptop",
+                price=100,
+                quantity=1,
+                order_id=order.id,
+                order_created_at=order.created_at,
+            )
+            for order in orders
+        )
+        await session.commit()
+
+    for order_id in (1, 2, 3, 4):
+        response = await async_client.delete(f"/orders/delete/{order_id}")
+        assert response.status_code == 204
+
+    async with get_test_session as session:
+        # Заказ 4 удалён недавно и остаётся в orders.
+        await session.execute(
+            update(Order)
+            .where(Order.id.in_([1, 2, 3]))
+            .values(deleted_at=datetime.now() - timedelta(days=40))
+        )
+        await session.commit()
+
+        service = OrderService(OrderRepository(session))
+        archived = await service.archive_deleted_orders(
+            timedelta(days=30), batch_size=2, max_batches=1
+        )
+        assert archived == 2
+        archived = await service.archive_deleted_orders(
+            timedelta(days=30), batch_size=2
+        )
+        assert archived == 1
+
+        assert (await session.scalars(select(Order.id).order_by(Order.id))).all() == [
+            4,
+            5,
+        ]
+        assert (await session.scalars(select(OrderArchive.id))).all() == [1, 2, 3]
+        assert (
+            await session.scalars(
+                select(ProductArchive.order_id).order_by(ProductArchive.order_id)
+            )
+        ).all() == [1, 2, 3]
+        assert (await session.scalars(select(Product.order_id))).all() == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_get_archived_order(get_test_session, login_admin_user):
+    """Тест на чтение заказа из архива администратором."""
+    async_client, user = login_admin_user
+    now = datetime.now()
+    async with get_test_session as session:
+        session.add(
+            OrderArchive(
+                id=7,
+                customer_name="John Doe",
+                total_price=200,
+                status=OrderStatus.CONFIRMED,
+                user_id=user.id,
+                created_at=now,
+                updated_at=now,
+                deleted_at=now,
+            )
+        )
+        # Продукты добавляются не в порядке id: ответ всё равно упорядочен по id.
+        session.add_all(
+            [
+                ProductArchive(id=3, name="Cable", price=10, quantity=1, order_id=7),
+                ProductArchive(id=1, name="Mouse", price=100, quantity=2, order_id=7),
+                ProductArchive(id=2, name="Pad", price=20, quantity=1, order_id=7),
+            ]
+        )
+        await session.commit()
+
+    response = await async_client.get("/orders/archive/7")
+    assert response.status_code == 200
+    assert response.json() == {
+        "order_id": 7,
+        "customer_name": "John Doe",
+        "status": "confirmed",
+        "total_price": 200,
+        "products": [
+            {"name": "Mouse", "price": 100, "quantity": 2},
+            {"name": "Pad", "price": 20, "quantity": 1},
+            {"name": "Cable", "price": 10, "quantity": 1},
+        ],
+    }
+
+    response = await async_client.get("/orders/archive/8")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_archived_order_forbidden(login_regular_user):
+    """Тест на запрет чтения архива обычным пользователем."""
+    async_client, user = login_regular_user
+    response = await async_client.get("/orders/archive/1")
+    assert response.status_code == 403
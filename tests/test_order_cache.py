@@ -0,0 +1,271 @@
+import asyncio
+import json
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.application.repositories.order_repo import OrderRepository
+from app.application.services.order_service import OrderService
+from app.core import settings
+from app.infrastructure import redis_cache
+from app.infrastructure.cache_writer import CacheWriteQueue
+from app.infrastructure.local_cache import LocalCache
+from app.infrastructure.redis_cache import (
+    INSTANCE_ID,
+    redis_client,
+    set_order_cache,
+    get_order_cache,
+    get_orders_cache,
+    schedule_order_cache,
+    delete_order_cache,
+    handle_invalidation_message,
+    acquire_order_lock,
+    release_order_lock,
+)
+from app.infrastructure.serializers import (
+    SERIALIZERS,
+    CACHE_SCHEMA_VERSION,
+    encode_entry,
+    decode_entry,
+    get_serializer,
+)
+from app.infrastructure.stampede import EarlyRefresh
+from tests.conftest import GatedRedis
+
+ORDER_DATA = {
+    "order_id": 1,
+    "customer_name": "John Doe",
+    "status": "pending",
+    "total_price": 100,
+    "user_id": 1,
+    "products": [],
+}
+
+
+@pytest.fixture
+def l1_cache(monkeypatch):
+    """Включает локальный кэш заказов на время теста."""
+    cache = LocalCache(max_size=2, ttl=60)
+    monkeypatch.setattr(redis_cache, "order_l1_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_l1_cache_serves_hot_orders(l1_cache):
+    """Тест на чтение заказа из локального кэша без обращения к Redis."""
+    await set_order_cache(1, ORDER_DATA)
+    await redis_client.delete("order:1")
+
+    assert await get_order_cache(1) == ORDER_DATA
+
+
+@pytest.mark.asyncio
+async def test_l1_cache_is_bounded(l1_cache):
+    """Тест на вытеснение давно использованных заказов из локального кэша."""
+    for order_id in (1, 2, 3):
+        await set_order_cache(order_id, {**ORDER_DATA, "order_id": order_id})
+
+    assert len(l1_cache) == 2
+    assert l1_cache.get(1) is None
+
+
+@pytest.mark.asyncio
+async def test_l1_cache_invalidation(l1_cache):
+    """Тест на вытеснение заказа по сообщению другого воркера и при удалении."""
+    await set_order_cache(1, ORDER_DATA)
+    await set_order_cache(2, {**ORDER_DATA, "order_id": 2})
+
+    handle_invalidation_message(f"{INSTANCE_ID}:1".encode())
+    assert l1_cache.get(1) is not None
+
+    handle_invalidation_message(b"other-worker:1")
+    assert l1_cache.get(1) is None
+
+    await delete_order_cache(2)
+    assert l1_cache.get(2) is None
+    assert await get_order_cache(2) is None
+
+
+class SlowOrderRepository(OrderRepository):
+    """Репозиторий, который медленно загружает заказ и считает обращения к БД."""
+
+    calls = 0
+
+    async def get_by_id(self, order_id: int):
+        SlowOrderRepository.calls += 1
+        await asyncio.sleep(0.05)
+        return await super().get_by_id(order_id)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cache_misses_load_once(get_test_session, create_orders):
+    """Тест на единственную загрузку заказа из БД при одновременных промахах кэша."""
+    SlowOrderRepository.calls = 0
+    async with get_test_session as session:
+        service = OrderService(SlowOrderRepository(session))
+        orders = await asyncio.gather(*(service.get_order_by_id(2) for _ in range(5)))
+
+    assert SlowOrderRepository.calls == 1
+    assert {order.customer_name for order in orders} == {"Jane33"}
+    assert len({id(order) for order in orders}) == 5
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_waits_for_lock_owner(
+    monkeypatch, get_test_session, create_orders
+):
+    """Тест на ожидание кэша, пока заказ загружает процесс, владеющий блокировкой."""
+    monkeypatch.setattr(settings, "ORDER_CACHE_LOCK_TIMEOUT", 1.0)
+    SlowOrderRepository.calls = 0
+    token = await acquire_order_lock(1, 1.0)
+
+    async def other_process_loads():
+        await asyncio.sleep(0.1)
+        await set_order_cache(1, ORDER_DATA)
+        await release_order_lock(1, token)
+
+    async with get_test_session as session:
+        service = OrderService(SlowOrderRepository(session))
+        order, _ = await asyncio.gather(
+            service.get_order_by_id(1), other_process_loads()
+        )
+
+    assert SlowOrderRepository.calls == 0
+    assert order.customer_name == ORDER_DATA["customer_name"]
+
+
+def test_early_refresh_probability():
+    """Тест на досрочное обновление записей, близких к истечению."""
+    early_refresh = EarlyRefresh(beta=1.0)
+    early_refresh.record_load_time(10.0)
+
+    assert early_refresh.should_refresh(0.001)
+    assert not early_refresh.should_refresh(None)
+    assert not EarlyRefresh(beta=0).should_refresh(0.001)
+
+
+@pytest.mark.parametrize("name", SERIALIZERS)
+def test_cache_serializers_round_trip(name):
+    """Тест на кодирование и декодирование записи кэша каждым кодеком."""
+    try:
+        serializer = get_serializer(name)
+    except ValueError:
+        pytest.skip(f"{name} is not installed")
+
+    entry = encode_entry(serializer, ORDER_DATA)
+
+    assert entry[0] == CACHE_SCHEMA_VERSION
+    assert decode_entry(entry) == ORDER_DATA
+
+
+@pytest.mark.asyncio
+async def test_cache_ignores_old_schema_versions():
+    """Тест на то, что записи старого формата и других версий схемы считаются промахом."""
+    await redis_client.set("order:1", json.dumps(ORDER_DATA))
+    assert await get_order_cache(1) is None
+
+    entry = encode_entry(get_serializer("json"), ORDER_DATA)
+    await redis_client.set("order:1", bytes((CACHE_SCHEMA_VERSION + 1,)) + entry[1:])
+    assert await get_order_cache(1) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_write_queue_drops_when_full():
+    """Тест на фоновую запись кэша пайплайном и отбрасывание записей при переполнении очереди."""
+    queue = CacheWriteQueue(redis_client, max_size=2, batch_size=10)
+    results = [
+        queue.put(lambda pipe, i=i: pipe.set(f"queued:{i}", i)) for i in range(3)
+    ]
+    await queue.flush()
+
+    assert results == [True, True, False]
+    assert queue.stats() == {"depth": 0, "written": 2, "dropped": 1, "failed": 0}
+    assert await redis_client.mget("queued:0", "queued:1", "queued:2") == [
+        b"0",
+        b"1",
+        None,
+    ]
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_cache_write_queue_survives_failing_write():
+    """Тест на то, что ошибка в команде записи не останавливает фоновую задачу и не теряет очередь."""
+    queue = CacheWriteQueue(redis_client, max_size=10, batch_size=1)
+
+    def broken(pipe):
+        raise ValueError("broken write")
+
+    queue.put(broken)
+    queue.put(lambda pipe: pipe.set("queued:after", 1))
+    await queue.flush()
+
+    assert queue.stats() == {"depth": 0, "written": 1, "dropped": 0, "failed": 1}
+    assert await redis_client.get("queued:after") == b"1"
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_delete_does_not_wait_for_stuck_queue(monkeypatch):
+    """Тест на удаление из кэша при переполненной очереди и зависшем Redis: ожидание ограничено."""
+    gate = asyncio.Event()
+    queue = CacheWriteQueue(GatedRedis(redis_client, gate), max_size=1, batch_size=1)
+    monkeypatch.setattr(redis_cache, "cache_write_queue", queue)
+    monkeypatch.setattr(settings, "CACHE_WRITE_FLUSH_TIMEOUT", 0.05)
+    await set_order_cache(1, ORDER_DATA)
+    # Первая запись висит в пайплайне, вторая заполняет очередь.
+    queue.put(lambda pipe: pipe.set("queued:0", 0))
+    await asyncio.sleep(0)
+    queue.put(lambda pipe: pipe.set("queued:1", 1))
+
+    await asyncio.wait_for(delete_order_cache(1), 1)
+    assert await get_order_cache(1) is None
+
+    gate.set()
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_schedule_order_cache_writes_in_background():
+    """Тест на запись заказа в кэш без ожидания Redis в вызывающем запросе."""
+    assert schedule_order_cache(1, ORDER_DATA)
+    await redis_cache.cache_write_queue.flush()
+
+    assert await get_order_cache(1) == ORDER_DATA
+
+
+@pytest.mark.asyncio
+async def test_cache_reads_fail_open(monkeypatch, get_test_session, create_orders):
+    """Тест на чтение заказа из БД, когда Redis недоступен."""
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    def unavailable_pipeline(*args, **kwargs):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(redis_client, "get", unavailable)
+    monkeypatch.setattr(redis_client, "mget", unavailable)
+    monkeypatch.setattr(redis_client, "pipeline", unavailable_pipeline)
+
+    assert await get_order_cache(1) is None
+    assert await get_orders_cache([1, 2]) == {}
+    async with get_test_session as session:
+        order = await OrderService(OrderRepository(session)).get_order_by_id(1)
+    assert order.customer_name == "John Doe"
+    await redis_cache.cache_write_queue.flush()
+
+
+@pytest.mark.asyncio
+async def test_delete_wins_over_queued_cache_fill(
+    backlogged_cache_queue, login_admin_user, create_orders
+):
+    """Тест на удаление заказа, пока заполнение его кэша ещё ждёт в очереди записи."""
+    async_client, user = login_admin_user
+    response = await async_client.delete("/orders/delete/1")
+    assert response.status_code == 204
+
+    backlogged_cache_queue.set()
+    await redis_cache.cache_write_queue.flush()
+    response = await async_client.get("/orders/1")
+    assert response.status_code == 404
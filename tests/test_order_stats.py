@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import insert, select
+
+from app.application.repositories.order_repo import OrderRepository
+from app.application.services.order_service import OrderService
+from app.domain.models import OrderStats, OrderStatsTotal
+from app.domain.models.order import OrderStatus
+from app.domain.models.order_stats import STATS_TOTAL_SHARDS
+
+
+def stats_by_status(response) -> dict:
+    return {
+        item["status"]: (item["count"], item["revenue"]) for item in response.json()
+    }
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_order_changes(login_regular_user):
+    """Тест на обновление статистики при создании, изменении и удалении заказов."""
+    async_client, user = login_regular_user
+    products = [{"name": "Laptop", "price": 1000, "quantity": 1}]
+    for status in ("pending", "pending", "confirmed"):
+        response = await async_client.post(
+            "/orders/create",
+            json={"customer_name": "John", "status": status, "products": products},
+        )
+        assert response.status_code == 201
+    order_id = response.json()["order_id"]
+
+    response = await async_client.get("/orders/stats")
+    assert response.status_code == 200
+    assert stats_by_status(response) == {
+        "pending": (2, 2000),
+        "confirmed": (1, 1000),
+        "cancelled": (0, 0),
+    }
+
+    response = await async_client.put(
+        f"/orders/update/{order_id}",
+        json={
+            "customer_name": "John",
+            "status": "cancelled",
+            "products": [{"name": "Laptop", "price": 1000, "quantity": 3}],
+        },
+    )
+    assert response.status_code == 200
+    response = await async_client.get("/orders/stats")
+    assert stats_by_status(response) == {
+        "pending": (2, 2000),
+        "confirmed": (0, 0),
+        "cancelled": (1, 3000),
+    }
+
+    response = await async_client.delete(f"/orders/delete/{order_id}")
+    assert response.status_code == 204
+    response = await async_client.get("/orders/stats")
+    assert stats_by_status(response)["cancelled"] == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_stats_rebuild(get_test_session, login_admin_user, create_orders):
+    """Тест на пересчёт статистики по заказам, созданным в обход репозитория."""
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/stats")
+    assert stats_by_status(response)["cancelled"] == (0, 0)
+
+    async with get_test_session as session:
+        service = OrderService(OrderRepository(session))
+        assert await service.rebuild_stats() == 4
+        # Повторное удаление не должно уменьшать статистику второй раз.
+        order = create_orders[2]
+        order.is_deleted = True
+        await service.repository.delete(order)
+        await service.repository.delete(order)
+        assert (await service.get_stats())[OrderStatus.CANCELLED] == (1, 300)
+        assert (await service.get_stats(user_id=1))[OrderStatus.CANCELLED] == (0, 0)
+
+    response = await async_client.get("/orders/stats")
+    assert stats_by_status(response) == {
+        "pending": (1, 100),
+        "confirmed": (1, 200),
+        "cancelled": (1, 300),
+    }
+
+
+@pytest.mark.asyncio
+async def test_global_stats_read_totals(get_test_session, login_admin_user):
+    """Тест на чтение общей статистики из итогов, а не из строк всех пользователей."""
+    async_client, user = login_admin_user
+    products = [{"name": "Laptop", "price": 1000, "quantity": 1}]
+    response = await async_client.post(
+        "/orders/create", json={"customer_name": "John", "products": products}
+    )
+    assert response.status_code == 201
+
+    async with get_test_session as session:
+        repository = OrderRepository(session)
+        # Строка сводки, добавленная в обход итогов, в общую статистику не попадает.
+        await session.execute(
+            insert(OrderStats).values(
+                user_id=user.id, status=OrderStatus.CANCELLED, count=5, revenue=500
+            )
+        )
+        await session.commit()
+        assert OrderStatus.CANCELLED not in await repository.get_stats()
+        assert (await repository.get_stats(user.id))[OrderStatus.CANCELLED] == (5, 500)
+
+        await repository.rebuild_stats()
+        assert await repository.get_stats() == {OrderStatus.PENDING: (1, 1000)}
+        shards = await session.scalars(select(OrderStatsTotal.shard))
+        assert shards.all() == [user.id % STATS_TOTAL_SHARDS]
@@ -0,0 +1,26 @@
+from datetime import date
+
+import pytest
+
+from app.infrastructure.partitions import add_months, order_partition_name
+
+
+@pytest.mark.parametrize(
+    "month, months, expected",
+    [
+        (date(2026, 10, 1), 0, date(2026, 10, 1)),
+        (date(2026, 10, 1), 2, date(2026, 12, 1)),
+        (date(2026, 11, 1), 3, date(2027, 2, 1)),
+        (date(2026, 1, 1), -1, date(2025, 12, 1)),
+        (date(2026, 10, 18), 1, date(2026, 11, 1)),
+    ],
+)
+def test_add_months(month, months, expected):
+    """Тест на сдвиг месяца через границу года и приведение к первому числу."""
+    assert add_months(month, months) == expected
+
+
+def test_order_partition_name():
+    """Тест на имя месячной секции заказов."""
+    assert order_partition_name(date(2026, 3, 1)) == "orders_2026_03"
+    assert order_partition_name(date(2027, 12, 1)) == "orders_2027_12"
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+from fastapi_users.password import PasswordHelper
+
+from app.infrastructure.password_hashing import (
+    PasswordHashPool,
+    PasswordHashPoolFull,
+    password_hash_pool,
+)
+
+
+class SlowPasswordHelper(PasswordHelper):
+    """Хэширует пароль с задержкой, имитируя дорогую функцию."""
+
+    def hash(self, password: str) -> str:
+        time.sleep(0.1)
+        return super().hash(password)
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_rejects_overflow():
+    """Тест на отклонение операций сверх размера пула и очереди."""
+    pool = PasswordHashPool(workers=1, queue_size=1, helper=SlowPasswordHelper())
+    results = await asyncio.gather(
+        *(pool.hash("123") for _ in range(3)), return_exceptions=True
+    )
+    pool.shutdown()
+
+    assert sum(isinstance(r, PasswordHashPoolFull) for r in results) == 1
+    assert pool.rejected == 1
+    assert pool.helper.verify_and_update("123", results[0])[0]
+
+
+@pytest.mark.asyncio
+async def test_password_hash_pool_does_not_block_loop():
+    """Тест на то, что цикл событий обслуживает другие задачи, пока считается хэш."""
+    pool = PasswordHashPool(workers=1, queue_size=0, helper=SlowPasswordHelper())
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    await pool.hash("123")
+    ticker.cancel()
+    pool.shutdown()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_hash_pool_is_full(
+    monkeypatch, async_client, test_user
+):
+    """Тест на ответ 503 при переполненной очереди хэширования паролей."""
+    monkeypatch.setattr(password_hash_pool, "pending", 10**6)
+    response = await async_client.post(
+        "/auth/login",
+        data={"username": test_user.email, "password": "123"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
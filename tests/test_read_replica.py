@@ -0,0 +1,137 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.core import settings
+from app.domain.models import Base, Order
+from app.domain.models.order import OrderStatus
+from app.infrastructure.db_connection import get_read_async_session
+from app.infrastructure.redis_cache import (
+    cache_write_queue,
+    get_order_cache,
+    is_pinned_to_primary,
+)
+from app.main import app
+from tests.conftest import override_get_async_session
+
+
+@pytest_asyncio.fixture
+async def lagging_replica(monkeypatch, tmp_path):
+    """Подключает пустую реплику, отстающую от основной БД."""
+    monkeypatch.setattr(settings, "POSTGRES_READ_HOST", "replica")
+    replica_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    )
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    replica_session_maker = async_sessionmaker(replica_engine, expire_on_commit=False)
+
+    async def override_get_read_async_session():
+        async with replica_session_maker() as session:
+            yield session
+
+    app.dependency_overrides[get_read_async_session] = override_get_read_async_session
+    yield replica_session_maker
+    app.dependency_overrides[get_read_async_session] = override_get_async_session
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_user_writes(
+    lagging_replica, login_regular_user, create_orders
+):
+    """Тест на чтение с реплики и чтение из основной БД сразу после записи пользователя."""
+    async_client, user = login_regular_user
+    response = await async_client.get("/orders/all")
+    assert response.json()["items"] == []
+    assert (await async_client.get("/orders/1")).status_code == 404
+
+    order_data = {
+        "customer_name": "New",
+        "status": "pending",
+        "products": [{"name": "Laptop", "price": 1000, "quantity": 1}],
+    }
+    response = await async_client.post("/orders/create", json=order_data)
+    assert response.status_code == 201
+
+    response = await async_client.get("/orders/all")
+    assert len(response.json()["items"]) == 4
+    assert (await async_client.get("/orders/1")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_write_paths_use_primary(
+    lagging_replica, login_regular_user, create_orders
+):
+    """Тест на то, что обновление заказа читает его из основной БД, а не с реплики."""
+    async_client, user = login_regular_user
+    order_data = {
+        "customer_name": "Updated",
+        "status": "confirmed",
+        "products": [{"name": "Laptop", "price": 1000, "quantity": 1}],
+    }
+    response = await async_client.put("/orders/update/1", json=order_data)
+    assert response.status_code == 200
+    assert response.json()["customer_name"] == "Updated"
+
+
+@pytest.mark.asyncio
+async def test_admin_write_pins_admin(lagging_replica, login_admin_user, create_orders):
+    """Тест на закрепление за основной БД администратора, изменившего чужой заказ."""
+    async_client, user = login_admin_user
+    order_data = {
+        "customer_name": "Updated",
+        "status": "confirmed",
+        "products": [{"name": "Laptop", "price": 1000, "quantity": 1}],
+    }
+    response = await async_client.put("/orders/update/4", json=order_data)
+    assert response.status_code == 200
+
+    assert await is_pinned_to_primary(user.id)
+    response = await async_client.get("/orders/all")
+    assert len(response.json()["items"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_pinned_user_reads_past_replica_filled_cache(
+    lagging_replica, login_regular_user, create_orders
+):
+    """Тест на то, что чтения с реплики заполняют кэш, а закреплённый пользователь читает мимо него."""
+    async_client, user = login_regular_user
+    async with lagging_replica() as session:
+        session.add(
+            Order(
+                id=1,
+                customer_name="Stale",
+                total_price=100,
+                status=OrderStatus.PENDING,
+                user_id=user.id,
+            )
+        )
+        await session.commit()
+
+    assert (await async_client.get("/orders/1")).json()["customer_name"] == "Stale"
+    response = await async_client.get("/orders/all")
+    assert [o["customer_name"] for o in response.json()["items"]] == ["Stale"]
+    await cache_write_queue.flush()
+    assert (await get_order_cache(1))["customer_name"] == "Stale"
+
+    order_data = {
+        "customer_name": "Updated",
+        "status": "confirmed",
+        "products": [{"name": "Laptop", "price": 1000, "quantity": 1}],
+    }
+    response = await async_client.put("/orders/update/2", json=order_data)
+    assert response.status_code == 200
+
+    # После записи пользователь видит основную БД, а не копию с реплики из кэша.
+    assert (await async_client.get("/orders/1")).json()["customer_name"] == "John Doe"
+    response = await async_client.get("/orders/all")
+    assert [o["customer_name"] for o in response.json()["items"]] == [
+        "John Doe",
+        "Updated",
+        "Bob",
+    ]
+    # Прочитанное из основной БД обновляет кэш для остальных читателей.
+    await cache_write_queue.flush()
+    assert (await get_order_cache(1))["customer_name"] == "John Doe"
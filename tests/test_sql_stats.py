@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+
+from app.core import settings
+from app.infrastructure.sql_stats import (
+    RequestSqlStats,
+    normalize_sql,
+    report_request_sql,
+)
+
+
+def test_normalize_sql():
+    """Тест на приведение запроса к шаблону без литералов и параметров."""
+    statement = "SELECT x::text FROM t WHERE id IN ($1, $2, $3) AND name = 'O''Brien'\n  LIMIT 10"
+
+    assert (
+        normalize_sql(statement)
+        == "SELECT x::text FROM t WHERE id IN (...) AND name = ? LIMIT ?"
+    )
+
+
+def test_repeated_statements_reported_as_n_plus_one(monkeypatch, caplog):
+    """Тест на предупреждение о выражении, повторённом за запрос не меньше порога."""
+    monkeypatch.setattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 3)
+    stats = RequestSqlStats()
+    for _ in range(3):
+        stats.record("SELECT * FROM products WHERE order_id = ?", 0.001)
+    stats.record("SELECT * FROM orders", 0.001)
+
+    with caplog.at_level(logging.WARNING, logger="orders"):
+        report_request_sql(stats)
+
+    assert stats.count == 4
+    assert [record.getMessage() for record in caplog.records] == [
+        "Possible N+1 on -: 3 executions of SELECT * FROM products WHERE order_id = ?"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(monkeypatch, login_admin_user, create_orders):
+    """Тест на заголовок Server-Timing с числом и временем SQL-запросов."""
+    monkeypatch.setattr(settings, "SERVER_TIMING", True)
+    async_client, user = login_admin_user
+    response = await async_client.get("/orders/all")
+
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("db;dur=")
+    assert 'queries", total;dur=' in server_timing
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(monkeypatch, caplog, login_admin_user, create_orders):
+    """Тест на запись медленного запроса в лог вместе с маршрутом."""
+    monkeypatch.setattr(settings, "SQL_SLOW_QUERY_SECONDS", 1e-9)
+    async_client, user = login_admin_user
+    with caplog.at_level(logging.WARNING, logger="orders"):
+        response = await async_client.get("/orders/1")
+
+    assert response.status_code == 200
+    assert any(
+        "Slow query" in record.getMessage()
+        and "/orders/{order_id}" in record.getMessage()
+        for record in caplog.records
+    )
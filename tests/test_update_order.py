@@ -1,7 +1,13 @@
 import pytest
+from sqlalchemy import delete, func, select
 
-from app.domain.models import Order
+from app.domain.models import Order, Product
 from app.domain.models.order import OrderStatus
+from app.infrastructure.redis_cache import (
+    cache_write_queue,
+    order_l1_cache,
+    redis_client,
+)
 
 
 @pytest.mark.asyncio
@@ -72,3 +78,138 @@ async def test_update_order_invalid_data(get_test_session, login_admin_user):
     response = await async_client.put(f"/orders/update/{order.id}", json=update_data)
     assert response.status_code == 400
     assert "detail" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_update_order_keeps_unchanged_products(
+    get_test_session, login_admin_user
+):
+    """Тест обновления заказа: неизменённые продукты не пересоздаются"""
+    async_client, user = login_admin_user
+    order_data = {
+        "customer_name": "John Doe",
+        "status": "pending",
+        "products": [
+            {"name": "Laptop", "price": 1000, "quantity": 1},
+            {"name": "Mouse", "price": 50, "quantity": 2},
+            {"name": "Cable", "price": 10, "quantity": 5},
+        ],
+    }
+    response = await async_client.post("/orders/create", json=order_data)
+    order_id = response.json()["order_id"]
+
+    async with get_test_session as session:
+        rows = await session.execute(
+            select(Product.name, Product.id).where(Product.order_id == order_id)
+        )
+        ids_before = dict(rows.all())
+
+    update_data = {
+        "customer_name": "John Updated",
+        "status": "confirmed",
+        "products": [
+            {"name": "Laptop", "price": 1000, "quantity": 1},
+            {"name": "Mouse", "price": 50, "quantity": 3},
+        ],
+    }
+    response = await async_client.put(f"/orders/update/{order_id}", json=update_data)
+
+    assert response.status_code == 200
+    assert response.json()["products"] == update_data["products"]
+    assert response.json()["total_price"] == 1150
+
+    async with get_test_session as session:
+        rows = await session.execute(
+            select(Product.id, Product.name, Product.quantity)
+            .where(Product.order_id == order_id)
+            .order_by(Product.id)
+        )
+        products_after = rows.all()
+
+    assert len(products_after) == 2
+    assert (ids_before["Laptop"], "Laptop", 1) in products_after
+    # Изменённый продукт обновляется на месте одной из освободившихся строк.
+    assert products_after[1].name == "Mouse"
+    assert products_after[1].quantity == 3
+    assert products_after[1].id in (ids_before["Mouse"], ids_before["Cable"])
+
+
+@pytest.mark.asyncio
+async def test_update_order_products_order_matches_db(
+    get_test_session, login_admin_user
+):
+    """Тест порядка продуктов после обновления: ответ, кэш и БД отдают их в порядке из запроса"""
+    async_client, user = login_admin_user
+    products = [{"name": name, "price": 10, "quantity": 1} for name in ("A", "B", "C")]
+    response = await async_client.post(
+        "/orders/create", json={"customer_name": "John", "products": products}
+    )
+    order_id = response.json()["order_id"]
+
+    update_data = {
+        "customer_name": "John",
+        "status": "pending",
+        "products": [
+            {"name": "C", "price": 10, "quantity": 5},
+            {"name": "A", "price": 10, "quantity": 1},
+        ],
+    }
+    response = await async_client.put(f"/orders/update/{order_id}", json=update_data)
+    updated = [p["name"] for p in response.json()["products"]]
+    await cache_write_queue.flush()
+    cached = await async_client.get(f"/orders/{order_id}")
+
+    await cache_write_queue.flush()
+    await redis_client.flushdb()
+    order_l1_cache.clear()
+    from_db = await async_client.get(f"/orders/{order_id}")
+
+    assert updated == ["C", "A"]
+    assert [p["name"] for p in cached.json()["products"]] == updated
+    assert [p["name"] for p in from_db.json()["products"]] == updated
+
+    # Перестановка с добавлением: продукты после переставленного вставляются новыми строками.
+    update_data["products"] = [
+        {"name": name, "price": 10, "quantity": 1} for name in ("A", "D", "C")
+    ]
+    response = await async_client.put(f"/orders/update/{order_id}", json=update_data)
+    assert [p["name"] for p in response.json()["products"]] == ["A", "D", "C"]
+    await cache_write_queue.flush()
+    await redis_client.flushdb()
+    order_l1_cache.clear()
+    from_db = await async_client.get(f"/orders/{order_id}")
+    assert [p["name"] for p in from_db.json()["products"]] == ["A", "D", "C"]
+
+
+@pytest.mark.asyncio
+async def test_update_archived_order_leaves_no_products(
+    get_test_session, login_admin_user
+):
+    """Тест обновления заказа, который есть в кэше, но уже перенесён из orders: 404 и без продуктов-сирот"""
+    async_client, user = login_admin_user
+    products = [{"name": "Laptop", "price": 1000, "quantity": 1}]
+    response = await async_client.post(
+        "/orders/create", json={"customer_name": "John", "products": products}
+    )
+    order_id = response.json()["order_id"]
+    assert (await async_client.get(f"/orders/{order_id}")).status_code == 200
+    await cache_write_queue.flush()
+
+    async with get_test_session as session:
+        await session.execute(delete(Product).where(Product.order_id == order_id))
+        await session.execute(delete(Order).where(Order.id == order_id))
+        await session.commit()
+
+    update_data = {
+        "customer_name": "John",
+        "status": "pending",
+        "products": [{"name": "Mouse", "price": 50, "quantity": 2}],
+    }
+    response = await async_client.put(f"/orders/update/{order_id}", json=update_data)
+    assert response.status_code == 404
+
+    async with get_test_session as session:
+        orphans = await session.scalar(
+            select(func.count()).where(Product.order_id == order_id)
+        )
+    assert orphans == 0